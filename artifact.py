@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import struct
+import zlib
+from graph import GameGraph
+from outcomes import CLASSES, NAMES
+
+FORMAT = 2 # bumped whenever the game dictionary or base cases of a run would change
+
+def artifact_key(state, q, prefixes, suffixes, conj, horizon, window=0):
+    '''
+    Hash of everything that determines the compiled game graph and base cases of a run.
+
+    :param prefixes: set of tuples of prefix patterns
+    :param suffixes: set of tuples of suffix patterns
+    :returns: hexadecimal SHA-256 digest
+    '''
+    key = {
+        "format": FORMAT,
+        "state": state,
+        "q": q,
+        "prefixes": sorted("".join(p) for p in prefixes),
+        "suffixes": sorted("".join(s) for s in suffixes),
+        "conj": bool(conj),
+        "horizon": horizon,
+        "window": window
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+class ArtifactCache:
+    '''
+    Folder of compiled game graphs and their base cases, one zlib-compressed file per
+    artifact key, so a rerun with the same inputs can start searching right away.
+    '''
+    def __init__(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+
+    def path(self, key):
+        return os.path.join(self.folder, f"{key}.graph")
+
+    def load(self, key):
+        '''
+        Return (graph, base_cases) stored under key, or None if there is none.
+        '''
+        try:
+            with open(self.path(key), "rb") as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        (size,) = struct.unpack_from("<Q", data)
+        graph = GameGraph.from_bytes(data[8:8 + size])
+        # base cases of states outside the graph follow as newline-separated names and one mask each
+        extra = data[8 + size:]
+        (length,) = struct.unpack_from("<Q", extra)
+        names = extra[8:8 + length].decode().split("\n")
+        masks = extra[8 + length:]
+        base_cases = {name: NAMES[mask] for name, mask in zip(names, masks)}
+        base_cases.update({state: NAMES[graph.base[i]] for i, state in enumerate(graph.names) if graph.base[i]})
+        return graph, base_cases
+
+    def store(self, key, graph, base_cases):
+        '''
+        Write a graph and its base cases under key. The file is written under a temporary
+        name and renamed, so concurrent runs never read a partial artifact.
+        '''
+        data = graph.to_bytes()
+        extra = {state: value for state, value in base_cases.items() if state not in graph.ids}
+        names = "\n".join(extra).encode()
+        masks = bytes(CLASSES[value] for value in extra.values())
+        payload = struct.pack("<Q", len(data)) + data + struct.pack("<Q", len(names)) + names + masks
+        temporary = f"{self.path(key)}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(zlib.compress(payload))
+        os.replace(temporary, self.path(key))
@@ -0,0 +1,171 @@
+import contextlib
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import generator
+import segclobber
+from prover import evaluate
+from search import search_graph
+from scc import evaluate_scc
+from dfpn import evaluate_dfpn
+
+def read_specs(path, horizon=None, window=0):
+    '''
+    Read family specs from a JSON lines file, one object per line with the keys "state",
+    and optionally "q" (default "xxo"), "prefixes" and "suffixes" (default: the prefix and
+    suffix of state), "conj" (default false), "horizon" and "window".
+
+    :param horizon: horizon of families without one (optional, see generator.run)
+    :param window: window of families without one (optional)
+    '''
+    specs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            spec = json.loads(line)
+            prefix, _, suffix = spec["state"].partition("_")
+            specs.append({
+                "state": spec["state"],
+                "q": spec.get("q", "xxo"),
+                "prefixes": spec.get("prefixes", [prefix]),
+                "suffixes": spec.get("suffixes", [suffix]),
+                "conj": bool(spec.get("conj", False)),
+                "horizon": spec.get("horizon", horizon),
+                "window": spec.get("window", window)
+            })
+    return specs
+
+def patterns(items):
+    '''
+    Set of tuples of patterns, as parsed by run.py.
+    '''
+    return {tuple(item) for item in items} or {()}
+
+def closure(spec):
+    '''
+    The complete sets of prefixes and suffixes of a family, and its small positions
+    (run in a worker process).
+    '''
+    with contextlib.redirect_stdout(io.StringIO()):
+        prefixes, suffixes, small = generator.generate_patterns(patterns(spec["prefixes"]), patterns(spec["suffixes"]), tuple(spec["q"]))
+    return frozenset(prefixes), frozenset(suffixes), frozenset(small)
+
+def group_families(specs, closures=None):
+    '''
+    Group families so that each group can be searched on the game graph of its first family:
+    families with the same q, conj, horizon and window whose closed sets of prefixes and
+    suffixes are contained in those of the first. Larger closures are placed first.
+
+    :param closures: closure of each family (see closure), computed here if not given (optional)
+    :returns: list of lists of indices into specs
+    '''
+    if closures is None:
+        closures = [closure(spec) for spec in specs]
+    order = sorted(range(len(specs)), key=lambda i: -len(closures[i][0]) - len(closures[i][1]))
+    groups = []
+    for i in order:
+        spec = specs[i]
+        kind = (spec["q"], spec["conj"], spec["horizon"], spec["window"])
+        for group in groups:
+            root = specs[group[0]]
+            prefixes, suffixes, small = closures[group[0]]
+            if kind == (root["q"], root["conj"], root["horizon"], root["window"]) and closures[i][0] <= prefixes and closures[i][1] <= suffixes:
+                group.append(i)
+                break
+        else:
+            groups.append([i])
+    return groups
+
+def build(spec, closure, engine, outcome_cache, artifact_cache):
+    '''
+    Build the base cases of a family from its closure, with the compiled game graph for the
+    iterative engine and the game dictionary for the others (run in a worker process).
+
+    :returns game_dict, base_cases, graph: game dictionary (or None), base cases, and GameGraph (or None)
+    '''
+    horizon = spec["horizon"] if spec["horizon"] is not None else 40 if spec["window"] else 14
+    compiled = engine == "iterative"
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_dict, base_cases, graph = generator.load_game_graph(spec["state"], spec["q"], patterns(spec["prefixes"]), patterns(spec["suffixes"]),
+                                                                 conj=spec["conj"], outcome_cache=outcome_cache, horizon=horizon,
+                                                                 window=spec["window"], artifact_cache=artifact_cache,
+                                                                 compiled=compiled, closure=closure)
+    return None if compiled else game_dict, base_cases, graph
+
+def solve(spec, closure, root, shared, engine, outcome_cache, artifact_cache):
+    '''
+    Search a family on the (game_dict, base_cases, graph) shared by the family root, or on its
+    own if its state is not in the shared graph (e.g. merged with a symmetric pattern). Runs
+    in a worker process.
+
+    :returns result: dictionary of the outcome class, nodes visited, search time, and the state whose graph was used
+    '''
+    game_dict, base_cases, graph = shared
+    state = spec["state"]
+    if "_" in state and state not in (graph.ids if graph is not None else game_dict):
+        root = state
+        game_dict, base_cases, graph = build(spec, closure, engine, outcome_cache, artifact_cache)
+    start = time.perf_counter()
+    if engine == "iterative":
+        value, nodes = search_graph(graph, graph.intern(state, base_cases), {})
+    elif engine == "scc":
+        value, nodes = evaluate_scc(state, game_dict, base_cases)
+    elif engine == "dfpn":
+        value, nodes = evaluate_dfpn(state, game_dict, base_cases)
+    else:
+        value, nodes = evaluate(state, game_dict, base_cases, 0, 0, {})
+    return {"outcome": value, "nodes": nodes, "time": round(time.perf_counter() - start, 3), "graph": root}
+
+def run_batch(specs, output, jobs=1, engine="recursive", outcome_cache=None, artifact_cache=None):
+    '''
+    Solve many families with a pool of worker processes. The closures of all families are
+    computed in the pool first. Families that fit in the closure of another one (see
+    group_families) share its game graph, which is built once, and solver results are
+    shared between workers through the outcome cache. Each family's record is
+    appended to output as soon as its search finishes, so the order follows completion.
+
+    :param specs: list of family specs (see read_specs)
+    :param output: JSON lines file the records are written to
+    :param jobs: number of worker processes
+    :param engine: search engine, one of generator.ENGINES
+    :param outcome_cache: path of the SQLite file caching outcome classes of small positions (optional)
+    :param artifact_cache: folder of compiled game graphs and base cases (optional)
+    :returns records: list of records in the order they were written
+    '''
+    records = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=segclobber.set_backend, initargs=(segclobber.backend,)) as pool, \
+         open(output, "w", encoding="utf-8") as f:
+        closures = list(pool.map(closure, specs))
+        groups = group_families(specs, closures)
+        pending = {pool.submit(build, specs[group[0]], closures[group[0]], engine, outcome_cache, artifact_cache): ("build", group) for group in groups}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, task = pending.pop(future)
+                if kind == "build":
+                    if future.exception() is not None: # report the error for every family of the group
+                        for i in task:
+                            records.append(write_record(f, specs[i], {"graph": specs[task[0]]["state"], "error": repr(future.exception())}))
+                        continue
+                    for i in task:
+                        pending[pool.submit(solve, specs[i], closures[i], specs[task[0]]["state"], future.result(), engine, outcome_cache, artifact_cache)] = ("solve", (i, task[0]))
+                else:
+                    i, root = task
+                    result = {"graph": specs[root]["state"], "error": repr(future.exception())} if future.exception() is not None else future.result()
+                    records.append(write_record(f, specs[i], result))
+    return records
+
+def write_record(f, spec, result):
+    '''
+    Append the record of a family to the output file, and print a summary.
+    '''
+    record = {**spec, **result}
+    f.write(json.dumps(record) + "\n")
+    f.flush()
+    if "error" in result:
+        print(f"{spec['state']} (q = {spec['q']}): failed with {result['error']}")
+    else:
+        print(f"{spec['state']} (q = {spec['q']}): {result['outcome']}, {result['nodes']} nodes, graph of {result['graph']}")
+    return record
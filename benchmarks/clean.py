@@ -0,0 +1,55 @@
+import argparse
+import random
+import time
+import tree
+
+def subgame(rng, length, underscore):
+    '''
+    Random subgame of up to {length} pieces, with an underscore if requested.
+    '''
+    s = "".join(rng.choice("xo") for _ in range(rng.randint(0, length)))
+    if underscore:
+        i = rng.randint(0, len(s))
+        s = f"{s[:i]}_{s[i:]}"
+    return s
+
+def synthetic_children(size, seed=0, length=12, underscores=0.7):
+    '''
+    Set of {size} random sumgame tuples, shaped like the children of a state with a long q:
+    each subgame has an underscore with probability {underscores}.
+    '''
+    rng = random.Random(seed)
+    children = set()
+    while len(children) < size:
+        pair = [subgame(rng, length, rng.random() < underscores) for _ in range(2)]
+        children.add(tuple(sorted(pair)))
+    return children
+
+def timed(function, children, repeat):
+    '''
+    Best time of {repeat} calls of function on children, and its result.
+    '''
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(children)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the pairwise and indexed versions of tree.clean")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000], help="Numbers of children per move set")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (the best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'children':>8} {'kept':>6} {'pairwise':>10} {'indexed':>10} {'speedup':>8}")
+    for size in args.sizes:
+        children = synthetic_children(size, args.seed)
+        pairwise_time, expected = timed(tree.clean_pairwise, children, args.repeat)
+        indexed_time, result = timed(tree.clean, children, args.repeat)
+        assert result == expected
+        print(f"{size:>8} {len(result):>6} {pairwise_time:>9.4f}s {indexed_time:>9.4f}s {pairwise_time / indexed_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import contextlib
+import io
+import generator
+import segclobber
+from benchmarks.pipeline import FAMILIES
+from ordering import ORDERINGS, MoveOrdering
+from prover import evaluate
+
+# combinations of policies measured by default; () is the default order (good moves first)
+POLICIES = [()] + [(policy,) for policy in ORDERINGS] + [ORDERINGS]
+
+def build(family):
+    '''
+    Game dictionary and base cases of a family, as built by generator.run.
+    '''
+    state, q, prefixes, suffixes, conj, horizon = FAMILIES[family]
+    p = {tuple(prefix) for prefix in prefixes} or {()}
+    s = {tuple(suffix) for suffix in suffixes} or {()}
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_dict, base_cases, graph = generator.build_game_graph(q, p, s, conj=conj, horizon=horizon)
+    return state, game_dict, base_cases
+
+def node_counts(family, policies=POLICIES):
+    '''
+    Search a family with each combination of policies.
+
+    :returns: dictionary mapping each combination to (outcome class, nodes visited)
+    '''
+    state, game_dict, base_cases = build(family)
+    result = {}
+    for combination in policies:
+        ordering = MoveOrdering(combination, game_dict, base_cases) if combination else None
+        result[combination] = evaluate(state, game_dict, base_cases, 0, 0, {}, ordering=ordering)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the node counts of move ordering policies on the README families")
+    parser.add_argument("--families", nargs="+", choices=list(FAMILIES), default=list(FAMILIES), metavar="FAMILY", help="Families to run (default: all)")
+    args = parser.parse_args()
+    segclobber.set_backend("python")
+
+    names = ["+".join(combination) or "default" for combination in POLICIES]
+    print(f"{'family':<14} " + " ".join(f"{name:>18}" for name in names))
+    for family in args.families:
+        counts = node_counts(family)
+        outcomes = {value for value, nodes in counts.values()}
+        assert len(outcomes) == 1, f"orderings disagree on {family}: {counts}"
+        print(f"{family:<14} " + " ".join(f"{nodes:>18}" for value, nodes in counts.values()))
+
+if __name__ == "__main__":
+    main()
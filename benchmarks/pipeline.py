@@ -0,0 +1,180 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import generator
+import segclobber
+import tree
+from export import export_proof
+from graph import compile_game_graph
+from prover import evaluate
+from scheduler import SolverScheduler
+from solver import ClobberSolver
+
+# the families from the README: name -> (state, q, prefixes, suffixes, conj, horizon)
+FAMILIES = {
+    "o(x)^n": ("o_", "x", ["o"], [], False, 14),
+    "xxo(x)^n": ("xxo_", "x", ["xxo"], [], False, 14),
+    "oox(o)^n": ("oox_", "o", ["oox"], [], False, 14),
+    "xoo(x)^n ox": ("xoo_ox", "x", ["xoo"], ["ox"], False, 14),
+    "conj (xxo)^n": ("_", "xxo", [], [], True, 8) # fewer copies: the Python solver is slow on long copies of xxo
+}
+
+# measurements compared against a baseline; more is worse for all of them
+METRICS = ["time", "nodes", "solver_calls", "peak"]
+
+def reset():
+    '''
+    Clear the in-process caches, so every run of a family does the same work.
+    '''
+    tree.symbolic_moves.cache_clear()
+    segclobber.python_solver = ClobberSolver()
+
+def pipeline(state, q, prefixes, suffixes, conj, horizon, folder):
+    '''
+    Generator running the phases of generator.build_game_graph and generator.run one at a
+    time. Each step yields the name of the phase just finished, its node count, and the
+    outcome class (after the search).
+    Node counts are: patterns found by the closure, moves in the game dictionary,
+    positions solved for base cases, states in the compiled graph, nodes searched, and
+    nodes in the proof file.
+    '''
+    p = {tuple(prefix) for prefix in prefixes} or {()}
+    s = {tuple(suffix) for suffix in suffixes} or {()}
+    prefixes, suffixes, small, keep = generator.pattern_closure(p, s, q)
+    yield "closure", len(prefixes) + len(suffixes), None
+
+    all_subgames, game_dict = generator.build_game_dict(prefixes, suffixes, q, conj, keep)
+    yield "game_dict", sum(len(moves) for children in game_dict.values() for moves in children.values()), None
+
+    scheduler = SolverScheduler()
+    base_cases, small = generator.solve_base_cases(all_subgames, small, q, horizon, scheduler)
+    yield "base_cases", scheduler.stats()["unique"], None
+
+    game_dict = generator.add_small_positions(game_dict, small)
+    graph = compile_game_graph(game_dict, base_cases)
+    yield "compile", len(graph.names), None
+
+    value, nodes = evaluate(state, game_dict, base_cases, 0, 0, {})
+    yield "search", nodes, value
+
+    stats = export_proof(os.path.join(folder, "proof.jsonl"), state, game_dict, base_cases)
+    yield "proof", stats["nodes"], None
+
+def measure(family, folder, traced):
+    '''
+    Run the pipeline for a family once, timing each phase, or measuring peak memory if traced.
+    Solver calls are counted by the in-process solver's searches.
+
+    :returns outcome, phases: outcome class and dictionary of measurements per phase
+    '''
+    reset()
+    phases = {}
+    outcome = None
+    steps = pipeline(*FAMILIES[family], folder)
+    while True:
+        calls = segclobber.python_solver.searches
+        if traced:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            step = next(steps, None)
+        elapsed = time.perf_counter() - start
+        if traced:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if step is None:
+            return outcome, phases
+        phase, nodes, value = step
+        outcome = value or outcome
+        phases[phase] = {"time": elapsed, "nodes": nodes, "solver_calls": segclobber.python_solver.searches - calls}
+        if traced:
+            phases[phase]["peak"] = peak
+
+def benchmark(families, repeat):
+    '''
+    Measure each family: the best time of repeat runs, and peak memory from one extra run with tracemalloc.
+    '''
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for family in families:
+            outcome, traced = measure(family, folder, True)
+            best = None
+            for _ in range(repeat):
+                _, phases = measure(family, folder, False)
+                if best is None:
+                    best = phases
+                for phase, row in phases.items():
+                    best[phase]["time"] = min(best[phase]["time"], row["time"])
+            for phase, row in best.items():
+                row["peak"] = traced[phase]["peak"]
+            state, q, prefixes, suffixes, conj, horizon = FAMILIES[family]
+            results[family] = {"state": state, "q": q, "horizon": horizon, "outcome": outcome, "phases": best}
+    return results
+
+def compare(results, baseline, threshold, time_threshold, min_time):
+    '''
+    List regressions against a baseline: changed outcomes, and measurements that grew by more
+    than threshold (a fraction), or time_threshold for times, which are noisier than the
+    counts. Times shorter than min_time seconds in both runs are ignored.
+    '''
+    regressions = []
+    for family, result in results.items():
+        old = baseline.get(family)
+        if old is None:
+            continue
+        if old["outcome"] != result["outcome"]:
+            regressions.append(f"{family}: outcome {old['outcome']} -> {result['outcome']}")
+        for phase, row in result["phases"].items():
+            for metric in METRICS:
+                before = old["phases"].get(phase, {}).get(metric)
+                after = row[metric]
+                if before is None or after <= before * (1 + (time_threshold if metric == "time" else threshold)):
+                    continue
+                if metric == "time" and max(before, after) < min_time:
+                    continue
+                increase = f" (+{after / before - 1:.0%})" if before else ""
+                regressions.append(f"{family}: {phase} {metric} {before:.4g} -> {after:.4g}{increase}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the phases of the full pipeline on the README families with the in-process solver")
+    parser.add_argument("--families", nargs="+", choices=list(FAMILIES), default=list(FAMILIES), metavar="FAMILY", help="Families to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per family (the best is reported)")
+    parser.add_argument("--output", default="benchmarks/pipeline.json", metavar="FILE", help="JSON file the results are written to")
+    parser.add_argument("--compare", metavar="FILE", help="Baseline results to flag regressions against; exits with status 1 if there are any")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative increase of nodes, solver calls or peak memory counted as a regression (default 0.1)")
+    parser.add_argument("--time-threshold", type=float, default=0.5, help="Relative increase of time counted as a regression (default 0.5)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Ignore time changes of phases faster than this many seconds (default 0.05)")
+    args = parser.parse_args()
+    segclobber.set_backend("python")
+
+    results = benchmark(args.families, args.repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"python": platform.python_version(), "families": results}, f, indent=4)
+
+    print(f"{'family':<14} {'phase':<11} {'time':>9} {'nodes':>9} {'calls':>7} {'peak':>10}")
+    for family, result in results.items():
+        for phase, row in result["phases"].items():
+            print(f"{family:<14} {phase:<11} {row['time']:>8.4f}s {row['nodes']:>9} {row['solver_calls']:>7} {row['peak'] / 1024:>8.0f}KB")
+        print(f"{family:<14} outcome {result['outcome']}")
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["families"]
+        regressions = compare(results, baseline, args.threshold, args.time_threshold, args.min_time)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import sqlite3
+
+SWAP_COLORS = str.maketrans("xo", "ox")
+SWAP_OUTCOME = {"L": "R", "R": "L", "N": "N", "P": "P", "U": "U"}
+
+def canonicalize(position):
+    '''
+    Return the canonical form of a position, and whether its colors were swapped.
+    Reversing a position keeps its outcome class, and swapping x and o swaps L and R,
+    so a position and its mirror images share one canonical form.
+
+    :param position: xo-string (e.g. "xxo")
+    :returns canonical, swapped: smallest of the position and its mirror images, and True if it has x and o swapped
+    '''
+    swapped = position.translate(SWAP_COLORS)
+    return min((position, False), (position[::-1], False), (swapped, True), (swapped[::-1], True))
+
+class OutcomeCache:
+    '''
+    Persistent cache of outcome classes of small positions, stored in SQLite so that
+    several runs can share it at once. Positions are stored in canonical form.
+    '''
+    def __init__(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS outcomes (position TEXT PRIMARY KEY, outcome TEXT NOT NULL)")
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, positions):
+        '''
+        Look up the outcome classes of positions.
+
+        :param positions: iterable of xo-strings
+        :returns result: dictionary mapping each cached position to its outcome class
+        '''
+        result = {}
+        for position in positions:
+            canonical, swapped = canonicalize(position)
+            row = self.connection.execute("SELECT outcome FROM outcomes WHERE position = ?", (canonical,)).fetchone()
+            if row is None:
+                self.misses += 1
+                continue
+            self.hits += 1
+            result[position] = SWAP_OUTCOME[row[0]] if swapped else row[0]
+        return result
+
+    def put_many(self, outcomes):
+        '''
+        Store outcome classes. Unknown outcomes ("U") are not stored, so they are retried on the next run.
+
+        :param outcomes: dictionary mapping positions to outcome classes
+        '''
+        rows = []
+        for position, outcome in outcomes.items():
+            if outcome == "U":
+                continue
+            canonical, swapped = canonicalize(position)
+            rows.append((canonical, SWAP_OUTCOME[outcome] if swapped else outcome))
+        with self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO outcomes VALUES (?, ?)", rows)
+
+    def stats(self):
+        '''
+        Summary of cache usage.
+        '''
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,63 @@
+import hashlib
+import os
+import pickle
+
+FORMAT = 1 # version of the checkpoint file format
+
+def graph_digest(graph):
+    '''
+    Hash of a compiled GameGraph, so that a checkpoint is only resumed on the graph it was taken on.
+    '''
+    return hashlib.sha256(graph.to_bytes()).hexdigest()
+
+class Checkpoint:
+    '''
+    File holding the latest snapshot of a search_graph search: the explicit stack with the
+    cursor of each frame, the current path, good moves, the node count, and the state of
+    the transposition table, proof recorder and telemetry counters. Snapshots are pickled,
+    written under a temporary name, synced to disk and renamed over the previous one, so
+    a crash at any time leaves either the old or the new snapshot.
+    '''
+    def __init__(self, path, interval=10000000):
+        '''
+        :param path: file the snapshots are written to
+        :param interval: number of nodes between snapshots
+        '''
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.interval = interval
+        self.saves = 0
+
+    def save(self, snapshot):
+        '''
+        Replace the stored snapshot with a dictionary of search state.
+        '''
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump({"format": FORMAT, **snapshot}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self.saves += 1
+
+    def load(self):
+        '''
+        Return the stored snapshot, or None if there is none.
+        '''
+        try:
+            with open(self.path, "rb") as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        if snapshot.get("format") != FORMAT:
+            raise ValueError(f"{self.path} is not a version {FORMAT} checkpoint")
+        return snapshot
+
+    def remove(self):
+        '''
+        Delete the stored snapshot, once the search it belongs to has finished.
+        '''
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,24 @@
+from outcomes import CLASSES, NAMES, SUM, P, U
+
+def split_components(position):
+    '''
+    Independent components of a position: the runs of stones between empty squares (".").
+    Components of a single color are dropped, since none of their stones has an opposite
+    neighbor, so they can never move and add nothing to the sum.
+
+    :param position: xo-string, possibly with empty squares (e.g. "xxo.ooo.ox")
+    :returns: list of components with stones of both colors (e.g. ["xxo", "ox"])
+    '''
+    return [component for component in position.split(".") if "x" in component and "o" in component]
+
+def combine(outcomes):
+    '''
+    Outcome class of a sum of games from the outcome classes of its summands, or None if
+    the outcome algebra does not determine it (e.g. L + N may be L or N, L + R may be anything).
+
+    :param outcomes: iterable of outcome classes (e.g. ["L", "P"])
+    '''
+    mask = P
+    for outcome in outcomes:
+        mask = SUM[mask][CLASSES[outcome]]
+    return NAMES[mask] if mask in NAMES and mask != U else None
@@ -0,0 +1,28 @@
+import random
+import pytest
+
+OUTCOMES = ["L", "R", "N", "P"]
+
+def random_game(seed, patterns=6, leaves=5, max_moves=3):
+    '''
+    Build a random game dictionary and base cases, with cycles between patterns.
+    Search engines must agree on these regardless of whether they describe real Clobber games.
+    '''
+    rng = random.Random(seed)
+    pattern_states = ["_"] + [f"{'x' * i}_" for i in range(1, patterns)]
+    leaf_states = ["o" * i for i in range(leaves)]
+    children = pattern_states + leaf_states * 2
+    game_dict = {}
+    for state in pattern_states:
+        game_dict[state] = {}
+        for player in ["x", "o"]:
+            moves = set()
+            for _ in range(rng.randint(0, max_moves)):
+                moves.add((rng.choice(children), rng.choice(children)))
+            game_dict[state][player] = tuple(sorted(moves))
+    base_cases = {state: rng.choice(OUTCOMES) for state in pattern_states + leaf_states}
+    return game_dict, base_cases
+
+@pytest.fixture
+def random_games():
+    return [random_game(seed) for seed in range(40)]
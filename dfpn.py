@@ -0,0 +1,211 @@
+from outcomes import NAMES, L, R, N, P, U
+
+INFINITY = 10 ** 12 # proof and disproof numbers of solved nodes
+
+# questions about a state: Left (x) or Right (o), moving first, surely wins (T) or surely loses (F)
+ATOMS = ("LT", "LF", "RT", "RF")
+# player moving, and whether the question is "some move wins" (or) rather than "every move loses" (and)
+QUESTIONS = {"LT": ('x', True), "LF": ('x', False), "RT": ('o', True), "RF": ('o', False)}
+# answers for a known outcome class
+ANSWERS = {"LT": L | N, "LF": R | P, "RT": R | N, "RF": L | P}
+# an outcome class is in a set of two classes if (first atom) and (either of two atoms):
+# L = LT and RF, R = LF and RT, N = LT and RT, P = LF and RF
+MEMBERS = {
+    L | P: ("RF", "LT", "LF"),
+    R | P: ("LF", "RT", "RF"),
+    R | N: ("RT", "LT", "LF"),
+    L | N: ("LT", "RT", "RF")
+}
+# a move by x wins if the sum is surely L or P, which it is exactly if both subgames are L or P,
+# and loses if the sum is surely R or N: one subgame is R or N and the other R or P (not N + N)
+WINS = {'x': L | P, 'o': R | P}
+LOSES = {'x': (R | N, R | P), 'o': (L | N, L | P)}
+
+class Node:
+    '''
+    Node of an and/or tree. Atoms ask one of ATOMS about a state on a path, and are
+    expanded into an or (some move wins) or and (every move loses) of their moves,
+    which are and/or formulas over the atoms of the subgames. Deps maps the states
+    whose presence on the path a solved node's answer depends on to whether they were on it.
+    '''
+    __slots__ = ("is_or", "pn", "dn", "children", "state", "atom", "path", "deps")
+
+    def __init__(self, is_or, children=None, state=None, atom=None, path=None):
+        self.is_or = is_or
+        self.children = children
+        self.state = state
+        self.atom = atom
+        self.path = path
+        self.deps = None
+        if children is None:
+            self.pn = self.dn = 1
+        else:
+            self.update()
+
+    def update(self):
+        '''
+        Proof and disproof numbers from the children (an or with no children is false).
+        '''
+        pns = [child.pn for child in self.children]
+        dns = [child.dn for child in self.children]
+        if self.is_or:
+            self.pn = min(pns, default=INFINITY)
+            self.dn = min(INFINITY, sum(dns))
+        else:
+            self.pn = min(INFINITY, sum(pns))
+            self.dn = min(dns, default=INFINITY)
+
+def constant(answer, deps):
+    '''
+    Solved leaf: true if answer, otherwise false.
+    '''
+    node = Node(True, [])
+    node.pn, node.dn = (0, INFINITY) if answer else (INFINITY, 0)
+    node.deps = deps
+    return node
+
+class ProofNumberSearch:
+    '''
+    Depth-first proof-number search (df-pn) of the outcome class of a state. The outcome
+    class is decided by the four atoms of ATOMS, each of which is proved or disproved
+    separately. Moves that the proof and disproof numbers show to be hard are set aside
+    until the easier ones are exhausted, so most refuting branches are never expanded.
+
+    Small positions and states on the path get the value in base_cases, as in evaluate,
+    so an atom's answer depends on the path. Solved atoms are stored with the states
+    whose presence on the path was looked up while solving them, and reused on any path
+    that gives the same answers for those states (which is exact).
+    '''
+    def __init__(self, game_dict, base_cases):
+        '''
+        :param game_dict: dictionary of all positions and their children after all possible x and o-moves
+        :param base_cases: dictionary of all values of small positions, and inductive hypotheses for patterns
+        '''
+        self.game_dict = game_dict
+        self.base_cases = base_cases
+        self.solved = {} # (state, atom) -> list of (deps, answer)
+        self.nodes = 0 # atoms created
+        self.reused = 0 # atoms answered from self.solved
+
+    def atom(self, state, atom, path):
+        '''
+        Node asking atom about state, whose parent states are in path (a frozenset).
+        '''
+        self.nodes += 1
+        if "_" not in state:
+            return constant(self.value(state) & ANSWERS[atom], {})
+        if state in path: # inductive hypothesis
+            return constant(self.value(state) & ANSWERS[atom], {state: True})
+        for deps, answer in self.solved.get((state, atom), ()):
+            if all((s in path) == on_path for s, on_path in deps.items()):
+                self.reused += 1
+                return constant(answer, deps)
+        return Node(QUESTIONS[atom][1], state=state, atom=atom, path=path)
+
+    def value(self, state):
+        value = self.base_cases[state]
+        return {"L": L, "R": R, "N": N, "P": P}.get(value, U)
+
+    def member(self, state, classes, path):
+        '''
+        Formula that the value of state is in a set of two outcome classes (see MEMBERS).
+        '''
+        first, either, other = MEMBERS[classes]
+        return Node(False, [self.atom(state, first, path), Node(True, [self.atom(state, either, path), self.atom(state, other, path)])])
+
+    def expand(self, node):
+        '''
+        Create the moves of an atom: formulas that a move wins (or) or loses (and).
+        '''
+        player, wins = QUESTIONS[node.atom]
+        path = node.path | {node.state}
+        children = []
+        for sub1, sub2 in self.game_dict[node.state].get(player, ()):
+            if wins:
+                children.append(Node(False, [self.member(sub1, WINS[player], path), self.member(sub2, WINS[player], path)]))
+            else:
+                first, second = LOSES[player]
+                children.append(Node(True, [
+                    Node(False, [self.member(sub1, first, path), self.member(sub2, second, path)]),
+                    Node(False, [self.member(sub1, second, path), self.member(sub2, first, path)])]))
+        node.children = children
+        node.update()
+
+    def mid(self, node, pn_threshold, dn_threshold):
+        '''
+        Search below node until its proof number reaches pn_threshold or its disproof number dn_threshold.
+        '''
+        if node.children is None:
+            self.expand(node)
+        while node.pn and node.dn and node.pn < pn_threshold and node.dn < dn_threshold:
+            # the most promising child, and the proof (or disproof) number of the second best
+            key = (lambda child: child.pn) if node.is_or else (lambda child: child.dn)
+            best = second = None
+            for child in node.children:
+                if best is None or key(child) < key(best):
+                    best, second = child, best
+                elif second is None or key(child) < key(second):
+                    second = child
+            bound = key(second) + 1 if second is not None else INFINITY
+            if node.is_or:
+                self.mid(best, min(pn_threshold, bound), min(INFINITY, dn_threshold - node.dn + best.dn))
+            else:
+                self.mid(best, min(INFINITY, pn_threshold - node.pn + best.pn), min(dn_threshold, bound))
+            node.update()
+        if node.deps is None and (not node.pn or not node.dn):
+            self.finish(node)
+
+    def finish(self, node):
+        '''
+        Collect the path dependencies of a solved node from the children that prove it,
+        store the answer of an atom, and free its subtree.
+        '''
+        answer = node.pn == 0
+        if answer == node.is_or: # one child is enough
+            proving = [next(child for child in node.children if (child.pn if answer else child.dn) == 0)]
+        else:
+            proving = node.children
+        deps = {}
+        for child in proving:
+            if child.deps is None: # solved when it was created, from constants
+                self.finish(child)
+            deps.update(child.deps)
+        if node.atom is not None:
+            deps.pop(node.state, None) # the state itself is always on the path below it
+            deps[node.state] = False
+            self.solved.setdefault((node.state, node.atom), []).append((deps, answer))
+        node.deps = deps
+        node.children = []
+
+    def prove(self, state, atom, path):
+        '''
+        Answer atom about state on a path.
+        '''
+        node = self.atom(state, atom, path)
+        self.mid(node, INFINITY, INFINITY)
+        return node.pn == 0
+
+def evaluate_dfpn(state, game_dict, base_cases, path_visited=None):
+    '''
+    Compute the outcome class with depth-first proof-number search (see ProofNumberSearch).
+    Like evaluate, the outcome is U unless it is known whether Left moving first wins,
+    and whether Right moving first wins.
+
+    :param state: starting position (e.g. "_")
+    :param game_dict: dictionary of all positions and their children after all possible x and o-moves
+    :param base_cases: dictionary of all values of small positions, and inductive hypotheses for patterns
+    :param path_visited: dictionary of states on the current path and their depths (optional)
+    :returns value, nodes: outcome class of position, and number of atoms created
+    '''
+    search = ProofNumberSearch(game_dict, base_cases)
+    path = frozenset(path_visited or ())
+    answers = {}
+    for player in "LR":
+        if search.prove(state, player + "T", path):
+            answers[player] = True
+        elif search.prove(state, player + "F", path):
+            answers[player] = False
+        else:
+            return "U", search.nodes
+    left, right = answers["L"], answers["R"]
+    return NAMES[N if left and right else L if left else R if right else P], search.nodes
@@ -0,0 +1,160 @@
+import gzip
+import hashlib
+import json
+from graph import strongly_connected_components
+from outcomes import CLASSES, NAMES, SUM, X_FEATURES, O_FEATURES, MUST_WIN, VALUE
+
+FORMAT = "clobber-proof-dag"
+VERSION = 1
+
+class ProofWriter:
+    '''
+    Writes proof nodes as JSON lines, one node per line, each with an integer ID.
+    A node with the same label, value and children as one already written is not
+    written again; its ID is reused. Only a 16 byte digest is kept per written node.
+    '''
+    def __init__(self, f):
+        self.f = f
+        self.ids = {} # digest of node contents -> node ID
+        self.references = 0 # nodes that reused an ID instead of being written
+
+    def node(self, label, value, children=None, hypothesis=False):
+        '''
+        Return the ID of a node, writing it if it is new.
+
+        :param children: dictionary with "LEFT" and "RIGHT" lists of (child ID, child ID) pairs (optional)
+        :param hypothesis: True if the value is the inductive hypothesis for a state already on the path (optional)
+        '''
+        content = {"label": label, "value": value}
+        if hypothesis:
+            content["hypothesis"] = True
+        if children is not None:
+            content["children"] = children
+        line = json.dumps(content, separators=(",", ":"))
+        digest = hashlib.blake2b(line.encode(), digest_size=16).digest()
+        node_id = self.ids.get(digest)
+        if node_id is not None:
+            self.references += 1
+            return node_id
+        node_id = len(self.ids)
+        self.ids[digest] = node_id
+        self.f.write(f'{{"id":{node_id},{line[1:]}\n')
+        return node_id
+
+class ProofFrame:
+    '''
+    A state of the proof being expanded.
+    '''
+    __slots__ = ("state", "key", "player", "moves", "index", "first", "features", "children")
+
+    def __init__(self, state, key, game_dict):
+        self.state = state
+        self.key = key
+        self.player = "x"
+        self.moves = game_dict[state].get("x", [])
+        self.index = 0
+        self.first = None # (ID, mask) of the first subgame of the current move
+        self.features = {"x": 0, "o": 0}
+        self.children = {"LEFT": [], "RIGHT": []}
+
+def export_proof(path, state, game_dict, base_cases):
+    '''
+    Write the proof tree of proof_tree as a DAG in JSON lines, without building it in
+    memory or limiting its depth. Nodes are written after their children, so every ID
+    refers to an earlier line. The first line describes the file, the last names the root.
+    The file is gzip-compressed if path ends in ".gz".
+
+    The subtree of a state only depends on which states of its strongly connected
+    component are on the path, since any other state on the path cannot be reached
+    from it. Subtrees are expanded once per such set, so shared subtrees are not
+    searched again.
+
+    :param path: output file (e.g. "json/example/example_proof.jsonl.gz")
+    :param state: starting position (e.g. "_")
+    :param game_dict: dictionary of all positions and their children after all possible x and o-moves
+    :param base_cases: dictionary of all values of small positions, and inductive hypotheses for patterns
+    :returns stats: dictionary with the root ID, number of nodes written, and number of reused nodes
+    '''
+    def successors(state):
+        return [g for moves in game_dict[state].values() for sumgame in moves for g in sumgame if "_" in g]
+    component = {}
+    for i, members in enumerate(strongly_connected_components(game_dict, successors)):
+        for member in members:
+            component[member] = i if len(members) > 1 else None
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": FORMAT, "version": VERSION, "state": state}) + "\n")
+        writer = ProofWriter(f)
+        path_visited = set()
+        on_path = {} # component (None for states outside any cycle) -> set of its states on the path
+        stack = []
+        expanded = {} # (state, states of its component on the path) -> (ID, mask)
+
+        def visit(state):
+            # return (ID, mask) of a small position, inductive hypothesis or expanded subtree, or start expanding state
+            if "_" not in state or state in path_visited:
+                value = base_cases[state]
+                return writer.node(state, value, hypothesis="_" in state), CLASSES[value]
+            members = on_path.setdefault(component[state], set())
+            key = (state, frozenset(members)) if component[state] is not None else state
+            if key in expanded:
+                return expanded[key]
+            path_visited.add(state)
+            members.add(state)
+            stack.append(ProofFrame(state, key, game_dict))
+            return None
+
+        result = visit(state)
+        while stack:
+            frame = stack[-1]
+            if result is None:
+                if frame.index < len(frame.moves): # expand the next subgame of the current move
+                    result = visit(frame.moves[frame.index][0 if frame.first is None else 1])
+                    continue
+                if frame.player == "x":
+                    frame.player = "o"
+                    frame.moves = game_dict[frame.state].get("o", [])
+                    frame.index = 0
+                    continue
+                # all moves are done: write the node and return its value to the parent
+                value = VALUE[frame.features["x"]][frame.features["o"]]
+                result = writer.node(frame.state, NAMES[value], frame.children), value
+                expanded[frame.key] = result
+                path_visited.remove(frame.state)
+                on_path[component[frame.state]].discard(frame.state)
+                stack.pop()
+                continue
+            if frame.first is None:
+                frame.first, result = result, None
+                continue
+            (id1, val1), (id2, val2) = frame.first, result
+            frame.first, result = None, None
+            frame.children["LEFT" if frame.player == "x" else "RIGHT"].append([id1, id2])
+            features = X_FEATURES if frame.player == "x" else O_FEATURES
+            frame.features[frame.player] |= features[SUM[val1][val2]]
+            frame.index += 1
+            if frame.features[frame.player] & MUST_WIN: # a winning move ends the search of this player's moves
+                frame.index = len(frame.moves)
+        root = result[0]
+        f.write(json.dumps({"root": root}) + "\n")
+    return {"root": root, "nodes": len(writer.ids), "references": writer.references}
+
+def read_proof(path):
+    '''
+    Read a proof written by export_proof.
+
+    :returns root, nodes: ID of the root, and dictionary mapping IDs to node records
+    '''
+    opener = gzip.open if path.endswith(".gz") else open
+    nodes = {}
+    with opener(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != FORMAT:
+            raise ValueError(f"{path} is not a proof DAG")
+        for line in f:
+            record = json.loads(line)
+            if "root" in record:
+                return record["root"], nodes
+            nodes[record["id"]] = record
+    raise ValueError(f"{path} ends before its root")
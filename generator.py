@@ -1,11 +1,28 @@
+from collections.abc import Mapping
 from itertools import product
 from utilities import generate_test_sequence, write_to_file, clear_file
 import tree
 from pprint import pp
-from prover import evaluate, proof_tree, write_status
+from prover import evaluate, proof_tree, write_status, ProofRecorder
+from telemetry import Telemetry
+from ordering import MoveOrdering
+from checkpoint import Checkpoint
+from search import search_graph
+from scc import evaluate_scc
+from dfpn import evaluate_dfpn
+from graph import compile_game_graph
+from parallel import evaluate_parallel
+from transposition import TranspositionTable
 import json
 import segclobber
+from scheduler import SolverScheduler
+from cache import OutcomeCache
+from artifact import ArtifactCache, artifact_key
+from export import export_proof
 import os
+import time
+
+ENGINES = ("recursive", "iterative", "scc", "dfpn")
 
 def simulate_move(q, x):
     '''
@@ -131,28 +148,81 @@ def generate_small_patterns(prefixes, suffixes, q):
     small.update([s[::-1] for s in reversed_small_q])
     return small
 
+class TailTrie:
+    '''
+    Trie of the tails of tuples, keyed from their last element, so that patterns
+    ending the same way share nodes. Each node stands for one tail t, and the moves
+    made in its first two pieces, (t[0],) + t[2:] and t[2:], only depend on t.
+    '''
+    def __init__(self):
+        self.root = {}
+        self.nodes = 0
+
+    def new_tails(self, pattern):
+        '''
+        Insert all tails of pattern, and return the indices i for which pattern[i:] was not in the trie yet.
+        '''
+        node = self.root
+        new = []
+        for i in range(len(pattern) - 1, -1, -1):
+            if pattern[i] not in node:
+                node[pattern[i]] = {}
+                self.nodes += 1
+                new.append(i)
+            node = node[pattern[i]]
+        return new
+
+def close_prefixes(prefixes, q, trie):
+    '''
+    Compute the closure of a set of prefixes under get_prefixes with a worklist: only
+    newly found prefixes are expanded, and moves in a tail shared with an earlier prefix
+    are not simulated again.
+
+    :param prefixes: set of tuples representing known prefix patterns
+    :param q: tuple representing repeating pattern
+    :param trie: TailTrie of the tails expanded so far
+    :returns result, rounds: set of all prefixes, and number of rounds until no new prefix was found
+    '''
+    result = set(prefixes)
+    pieces = set() # all pieces that could be to the left of q
+    if q:
+        pieces.add(q[-1])
+        result.update(simulate_move(q, [q[-1]]))
+    worklist = set(result)
+    rounds = 0
+    while worklist:
+        rounds += 1
+        found = set()
+        for prefix in worklist:
+            for i in trie.new_tails(prefix):
+                if prefix[i+1:] and prefix[i] != prefix[i+1]: # if the piece can capture to the right
+                    found.add((prefix[i],) + prefix[i+2:])
+                    found.add(prefix[i+2:])
+            if prefix and q and prefix[-1] not in pieces: # a new piece that could be to the left of q
+                pieces.add(prefix[-1])
+                found.update(simulate_move(q, [prefix[-1]]))
+        worklist = found - result
+        result.update(worklist)
+    return result, rounds
+
 def generate_patterns(prefixes, suffixes, q):
     '''
     Determine all prefixes and suffixes from a given set of prefixes, 
     suffixes, and repeating pattern.
 
-    :param prefixes: set of tuples of prefix patterns
-    :param suffixes: set of tuples of suffix patterns
+    :param prefixes: set of tuples of prefix patterns (updated in place)
+    :param suffixes: set of tuples of suffix patterns (updated in place)
     :param q: tuple representing repeating pattern
     :returns prefixes, suffixes: sets of tuples representing complete set of all prefixes and suffixes
     '''
-    while True:
-        p = get_prefixes(prefixes, q)
-        s = get_suffixes(suffixes, q)
-        print(prefixes)
-        print(suffixes)
-        print("*" * 50)
-
-        if p == prefixes and s == suffixes:
-            break
-        else:
-            prefixes.update(p)
-            suffixes.update(s)
+    prefix_trie = TailTrie()
+    p, prefix_rounds = close_prefixes(prefixes, q, prefix_trie)
+    # moves in a suffix are moves in the reversed suffix, as a prefix of reversed q
+    suffix_trie = TailTrie()
+    s, suffix_rounds = close_prefixes({suffix[::-1] for suffix in suffixes}, q[::-1], suffix_trie)
+    prefixes.update(p)
+    suffixes.update(suffix[::-1] for suffix in s)
+    print(f"Pattern closure: {len(prefixes)} prefixes in {prefix_rounds} rounds, {len(suffixes)} suffixes in {suffix_rounds} rounds, {prefix_trie.nodes + suffix_trie.nodes} trie nodes")
     small = generate_small_patterns(prefixes, suffixes, q)
     return prefixes, suffixes, small
 
@@ -162,69 +232,94 @@ def print_set(s):
         result.append("".join(list(item)))
     print(sorted(result, key=len))
 
-# THIS FUNCTION IS SPECFIC TO THE GAME (xxo)^n
-def find_symmetries_xxo(prefixes, suffixes, q):
+def reduce_pattern(prefix, suffix, q):
     '''
-    Given a list of prefixes, suffixes and repeating pattern q, find all 
-    symmetric positions.
+    Move whole copies of q at the end of prefix and the start of suffix into the "_".
 
-    :param prefixes: set of tuples of prefix patterns
-    :param suffixes: set of tuples of suffix patterns
-    :param q: tuple representing repeating pattern
-    :return result: list of lists of (prefix, suffix) tuples, where each internal list catalogues symmetric positions
+    :returns prefix, suffix, copies: the shortened prefix and suffix, and the number of copies removed
     '''
-    patterns = list(product(prefixes, suffixes))
-    result = []
-    for pattern in patterns:
-        p = pattern[0]
-        s = pattern[1]
-
-        new_p = s[::-1] + ('o',)        
-        if new_p[-len(q):] == q:
-            new_p = new_p[:-len(q)]
+    copies = 0
+    while q and prefix.endswith(q):
+        prefix = prefix[:-len(q)]
+        copies += 1
+    while q and suffix.startswith(q):
+        suffix = suffix[len(q):]
+        copies += 1
+    return prefix, suffix, copies
+
+def rotation(target, q):
+    '''
+    Return k such that target == q[k:] + q[:k], or None if target is not a rotation of q.
+    '''
+    for k in range(len(q)):
+        if q[k:] + q[:k] == target:
+            return k
+    return None
 
-        new_s = ('x', 'x',) + p[::-1]
-        if new_s[:len(q)] == q:
-            new_s = new_s[len(q):]
-        
-        if (tuple(new_p), tuple(new_s)) in patterns:
-            result.append([(tuple(new_p), tuple(new_s)), pattern])
-    return result
+def pattern_key(prefix, suffix, q):
+    '''
+    Canonical form of the family of positions prefix + q^n + suffix, up to reversal.
+    If the reversal of q is a rotation q[k:] + q[:k], the reversed positions are
+    reverse(suffix) + q[k:] + q^(n-1) + q[:k] + reverse(prefix), a family of the same q.
+    Copies of q at the ends are moved into the "_", and the returned offset counts the
+    copies of q this adds, so that prefix + q^n + suffix = key[0] + q^(n + offset) + key[1].
 
-# returns a formatted symmetries list that does not identify symmetries
-def empty_symmetries(prefixes, suffixes, q):
+    :returns key, offset: smallest of the (prefix, suffix) forms, and its offset
+    '''
+    prefix, suffix, copies = reduce_pattern(prefix, suffix, q)
+    forms = [((prefix, suffix), copies)]
+    k = rotation(q[::-1], q)
+    if k is not None:
+        reversed_prefix, reversed_suffix, reversed_copies = reduce_pattern(suffix[::-1] + q[k:], q[:k] + prefix[::-1], q)
+        forms.append(((reversed_prefix, reversed_suffix), copies + reversed_copies - 1))
+    return min(forms)
+
+def conjugate_key(prefix, suffix, q):
     '''
-    Given a list of prefixes, suffixes and repeating pattern q,
-    return a dummy formatted symmetries list, mapping positions to themselves.
+    pattern_key of the negative (x and o swapped) of a family, if it is a family of the same q, otherwise None.
+    '''
+    swap = str.maketrans("xo", "ox")
+    k = rotation(q.translate(swap), q)
+    if k is None:
+        return None
+    key, offset = pattern_key(prefix.translate(swap) + q[k:], q[:k] + suffix.translate(swap), q)
+    return key, offset - 1
+
+def find_symmetries(prefixes, suffixes, q, keep=()):
+    '''
+    Find the patterns "p_s" of a set of prefixes and suffixes that are the same family of
+    positions, for any repeating pattern q: a pattern and its reversal (with the reversal of
+    q rotated back to q, e.g. o(oxx)^n = oo(xxo)^(n-1)xx), and patterns that differ by copies
+    of q moved into or out of the "_". A pattern is only merged into one with fewer copies
+    of q in its key (see pattern_key), whose positions include all of its own. Swapping
+    colors also maps some families onto others when the swapped q is a rotation of q, but
+    exchanges L and R, so such pairs are only counted.
 
     :param prefixes: set of tuples of prefix patterns
     :param suffixes: set of tuples of suffix patterns
     :param q: tuple representing repeating pattern
-    :return result: list of lists of (prefix, suffix) tuples, where each internal list catalogues symmetric positions
+    :param keep: patterns that are kept as their own representatives, e.g. the starting position (optional)
+    :returns symmetries_dict, conjugates: dictionary mapping every pattern to its representative, and
+    the number of patterns whose negative is in another class of the set
     '''
-    patterns = list(product(prefixes, suffixes))
-    result = []
-    for pattern in patterns:
-        result.append([pattern, pattern])
-    return result
-
-def get_symmetries_dict(symmetries):
-    '''
-    Given a list of symmetric position pairs, return a dictionary mapping 
-    longer symmetries to their shorter pairs.
-
-    :param symmetries: list of lists of (prefix, suffix) tuples, where each internal list catalogues symmetric positions
-    :returns result: dictionary with keys and values corresponding to symmetric positions (e.g. {"_": "o_xx"})
-    '''
-    result = {}
-    for pair in symmetries:
-        simple_pair = []
-        for i in pair:
-            simple_pair.append("_".join("".join(inner) for inner in i))
-        #sorted_pair = sorted(simple_pair, key=len)
-        simple_pair.sort(key=lambda s: (len(s), s))
-        result[simple_pair[1]] = simple_pair[0]
-    return result  
+    q = "".join(q)
+    classes = {}
+    for prefix, suffix in product(prefixes, suffixes):
+        prefix, suffix = "".join(prefix), "".join(suffix)
+        key, offset = pattern_key(prefix, suffix, q)
+        classes.setdefault(key, []).append((offset, f"{prefix}_{suffix}", prefix, suffix))
+    symmetries_dict = {}
+    conjugates = 0
+    for key, members in classes.items():
+        # fewest copies of q first, then kept patterns, then the shortest
+        members.sort(key=lambda m: (m[0], m[1] not in keep, len(m[1]), m[1]))
+        representative = members[0][1]
+        for offset, name, prefix, suffix in members:
+            symmetries_dict[name] = name if name in keep else representative
+        negative = conjugate_key(members[0][2], members[0][3], q)
+        if negative is not None and negative[0] != key and negative[0] in classes:
+            conjugates += len(members)
+    return symmetries_dict, conjugates
 
 def print_patterns(p):
     '''
@@ -277,22 +372,30 @@ def add_small_positions(game_dict, small_positions):
                 }
             })
     '''
+    return {k: add_small_moves(v, small_positions) for k, v in game_dict.items()}
+
+def add_small_moves(children, small_positions):
+    '''
+    Add the moves to irregular small positions to the moves of one pattern (see add_small_positions).
+
+    :param children: dictionary of the sumgames resulting from x and o-moves
+    :param small_positions: dictionary with positional patterns as keys, and small irregular positions as values
+    :returns output: dictionary of sorted tuples of sumgames, including small irregular positions
+    '''
     pieces = ["x", "o"]
     output = {}
-    for k, v in game_dict.items():
-        output[k] = {}
-        for piece in pieces:
-            sumgames = v[piece] # set of all positions resulting from a move by {piece}
-            new_sumgames = set()
-            for sumgame in sumgames:
-                new_sumgames.add(sumgame)
-                for idx in range(2): # iterate through subgames and replace positional patterns with irregular small games
-                    if "_" in sumgame[(idx + 1) % 2]:
-                        subgame = sumgame[idx % 2]
-                        base_cases = small_positions[subgame] if subgame in small_positions else []
-                        for position in base_cases:
-                            new_sumgames.add((sumgame[(idx + 1) % 2], position))
-            output[k][piece] = tuple(sorted(new_sumgames, key=sort_key))
+    for piece in pieces:
+        sumgames = children[piece] # set of all positions resulting from a move by {piece}
+        new_sumgames = set()
+        for sumgame in sumgames:
+            new_sumgames.add(sumgame)
+            for idx in range(2): # iterate through subgames and replace positional patterns with irregular small games
+                if "_" in sumgame[(idx + 1) % 2]:
+                    subgame = sumgame[idx % 2]
+                    base_cases = small_positions[subgame] if subgame in small_positions else []
+                    for position in base_cases:
+                        new_sumgames.add((sumgame[(idx + 1) % 2], position))
+        output[piece] = tuple(sorted(new_sumgames, key=sort_key))
     return output
 
 def create_cgs_file(pattern_list, q, filename):
@@ -305,86 +408,366 @@ def create_cgs_file(pattern_list, q, filename):
         test_sequence = generate_test_sequence(pattern, q, 12)
         write_to_file(test_sequence, f"/Users/abel/CGScript/{filename}")
 
-def run(state, pattern, p, s, name=None, moves=False, conj=False):
+def initial_patterns(p, s):
     '''
-    Main function for calculating outcome class.
+    Set of the patterns "p_s" of the given prefixes and suffixes.
+    '''
+    return {f"{''.join(prefix)}_{''.join(suffix)}" for prefix, suffix in product(p, s)}
 
-    :param state: the starting position (e.g. "_")
+def build_game_dict(prefixes, suffixes, pattern, conj=False, keep=()):
+    '''
+    Build the dictionary of moves between patterns, with equivalent patterns merged (see find_symmetries).
+
+    :param prefixes: complete set of tuples of prefix patterns (see generate_patterns)
+    :param suffixes: complete set of tuples of suffix patterns
     :param pattern: the repeating pattern that "_" stands for (e.g. "xxo")
-    :param p: a set of prefixes that the position starts with (can be empty)
-    :param s: a set of suffixes that the position starts with (can be empty)
-    :param name: the name of the folder to save the output to (optional)
-    :param moves: flag to optionally load dictionary of moves (optional)
-    :returns value: the outcome class of the game
+    :param conj: flag to limit x to their leftmost move, capturing to the right (optional)
+    :param keep: patterns that are not merged into others, e.g. the starting position (optional)
+    :returns all_subgames, game_dict: sorted list of patterns, and dictionary of their moves
+    '''
+    # map patterns containing the same games onto one representative
+    all_subgames, symmetries_dict = find_symmetries_dict(prefixes, suffixes, pattern, keep)
+
+    # build dictionary of moves from symmetries
+    game_dict = {subgame: pattern_moves(subgame, pattern, symmetries_dict, conj) for subgame in all_subgames}
+    return all_subgames, game_dict
+
+def find_symmetries_dict(prefixes, suffixes, pattern, keep=()):
+    '''
+    Symmetries of build_game_dict, and the sorted list of representative patterns.
+    '''
+    symmetries_dict, conjugates = find_symmetries(prefixes, suffixes, tuple(pattern), keep)
+    all_subgames = sorted(set(symmetries_dict.values()))
+    print(f"Symmetries: {len(symmetries_dict)} patterns, {len(all_subgames)} after merging equivalent ones ({conjugates} are negatives of others, not merged)")
+    return all_subgames, symmetries_dict
+
+def pattern_moves(subgame, pattern, symmetries_dict, conj=False):
+    '''
+    Moves of one pattern for the game dictionary: the sumgames resulting from x and o-moves,
+    cleaned and with every subgame mapped to its representative.
+    '''
+    children = tree.symbolic_moves(subgame, pattern)
+    x_cleaned = tree.clean(children['x'])
+    x_simplified = tree.simplify(x_cleaned, symmetries_dict)
+    o_cleaned = tree.clean(children['o'])
+    o_simplified = tree.simplify(o_cleaned, symmetries_dict)
+
+    if conj:
+        xxo_conj_simplified = tree.simplify(tree.xxo_conjecture(subgame, pattern), symmetries_dict)
+        return {'x': tuple(xxo_conj_simplified), 'o': tuple(o_simplified)}
+    return {'x': tuple(x_simplified), 'o': tuple(o_simplified)}
+
+class LazyGameDict(Mapping):
+    '''
+    Read-only game dictionary that builds the moves of a pattern, including the moves to
+    its irregular small positions, the first time they are looked up. Searches only look
+    up the states they reach, so the moves of the others are never found, cleaned and
+    simplified. Iterating over all items builds every state.
+    '''
+    def __init__(self, all_subgames, pattern, symmetries_dict, conj=False, small_positions=None):
+        '''
+        :param all_subgames: sorted list of representative patterns
+        :param pattern: the repeating pattern that "_" stands for (e.g. "xxo")
+        :param symmetries_dict: dictionary mapping every pattern to its representative
+        :param conj: flag to limit x to their leftmost move, capturing to the right (optional)
+        :param small_positions: dictionary of small irregular positions of each pattern, added to the moves (optional)
+        '''
+        self.all_subgames = all_subgames
+        self.states = set(all_subgames)
+        self.pattern = pattern
+        self.symmetries_dict = symmetries_dict
+        self.conj = conj
+        self.small_positions = small_positions
+        self.built = {} # state -> moves, for the states looked up so far
+
+    def __getitem__(self, state):
+        moves = self.built.get(state)
+        if moves is None:
+            if state not in self.states:
+                raise KeyError(state)
+            moves = pattern_moves(state, self.pattern, self.symmetries_dict, self.conj)
+            if self.small_positions is not None:
+                moves = add_small_moves(moves, self.small_positions)
+            self.built[state] = moves
+        return moves
+
+    def __contains__(self, state):
+        return state in self.states
+
+    def __iter__(self):
+        return iter(self.all_subgames)
+
+    def __len__(self):
+        return len(self.all_subgames)
+
+    @property
+    def materialized(self):
+        '''
+        Number of states whose moves have been built.
+        '''
+        return len(self.built)
+
+def pattern_closure(p, s, pattern):
+    '''
+    Close the prefixes and suffixes under moves (see generate_patterns).
+
+    :returns prefixes, suffixes, small, keep: complete sets of prefixes and suffixes, small positions,
+    and the starting patterns, which are not merged into others (see build_game_dict)
+    '''
+    # the patterns the search starts from are kept, before the closure adds to p and s
+    keep = initial_patterns(p, s)
+    prefixes, suffixes, small = generate_patterns(p, s, tuple(pattern))
+    return prefixes, suffixes, small, keep
+
+def load_game_dict(name):
+    '''
+    Load the dictionary of moves saved by save_game_dict.
+
+    :returns all_subgames, game_dict, small: sorted list of patterns, dictionary of their moves, and small positions they lead to
+    '''
+    with open(f'json/{name}/{name}_game_dict.json', 'r') as f:
+        game_dict = {subgame: {player: tuple(tuple(sumgame) for sumgame in sumgames) for player, sumgames in children.items()}
+                     for subgame, children in json.load(f).items()}
+    # small positions are the subgames without an underscore that moves lead to
+    small = {tuple(g) for children in game_dict.values() for sumgames in children.values() for sumgame in sumgames for g in sumgame if "_" not in g}
+    return sorted(game_dict.keys()), game_dict, small
+
+def save_game_dict(game_dict, name):
+    '''
+    Save the dictionary of moves, so it can be loaded with moves=True.
+    '''
+    os.makedirs(f"json/{name}", exist_ok=True)
+    with open(f'json/{name}/{name}_game_dict.json', 'w', encoding='utf-8') as f:
+        json.dump(game_dict, f, indent=4)
+
+def solve_base_cases(all_subgames, small, pattern, horizon, scheduler, window=0):
+    '''
+    Compute the base cases of all patterns and small positions with SEGClobber (see
+    segclobber.compute_all_base_cases), and print the solver statistics and horizons.
+
+    :param small: set of tuples of small positions
+    :param scheduler: SolverScheduler the positions are solved with
+    :returns base_cases, small: base cases, and the irregular small positions of each pattern
+    '''
+    print(f"Computing base cases with the {segclobber.resolve_backend()} solver...")
+    horizons = {}
+    base_cases, small = segclobber.compute_all_base_cases(all_subgames, 
+                                                   ["".join(s) for s in small], 
+                                                   pattern, 
+                                                   horizon,
+                                                   scheduler,
+                                                   window,
+                                                   horizons)
+    solver_stats = scheduler.stats()
+    print(f"SEGClobber: {solver_stats['requested']} positions requested, {solver_stats['unique']} unique, {solver_stats['forms']} after splitting into canonical components, {solver_stats['calls']} solver calls, {solver_stats['failures']} failures")
+    for position, player, error in scheduler.failures:
+        print(f"SEGClobber failed on {position} ({player} to move): {error}")
+    if scheduler.cache is not None:
+        print(f"Outcome cache: {solver_stats['cache']['hits']} hits, {solver_stats['cache']['misses']} misses ({solver_stats['cache']['hit_rate']:.1%} hit rate)")
+    lengths = [length for length, period in horizons.values()]
+    print(f"Base case horizon: {min(lengths)} to {max(lengths)} copies of {pattern}" + (f" (adaptive, window {window})" if window else ""))
+    for subgame, (length, period) in sorted(horizons.items()):
+        if period is None:
+            print(f"Outcomes of {subgame} are not stable after {length} copies of {pattern}")
+        elif period > 1:
+            print(f"Outcomes of {subgame} repeat with period {period}, not a single inductive hypothesis")
+    pp(base_cases)
+    pp(small)
+    return base_cases, small
+
+def build_game_graph(pattern, p, s, name=None, moves=False, conj=False, outcome_cache=None, horizon=14, window=0, lazy=False, compiled=True, closure=None, failures=None):
+    '''
+    Build the dictionary of moves, compute base cases, and compile the game graph, running
+    the phases pattern_closure, build_game_dict, solve_base_cases, add_small_positions and
+    compile_game_graph. Arguments are the same as for run.
+
+    :param compiled: compile the game graph; if False, None is returned in its place (optional)
+    :param closure: prefixes, suffixes and small positions returned by generate_patterns for p and s, if already computed (optional)
+    :param failures: list filled with (position, player, error) for the solver calls that failed (optional)
+    :returns game_dict, base_cases, graph: dictionary of moves including small positions, base cases, and compiled GameGraph
+    (with lazy, a LazyGameDict and no graph)
     '''
-    q = tuple(pattern)
-    
     print("Building dictionary of possible moves...")
     if moves:
-        with open(f'json/{name}/{name}_game_dict.json', 'r') as f:
-            game_dict = json.load(f)
-    
+        all_subgames, game_dict, small = load_game_dict(name)
     else:
-        prefixes, suffixes, small = generate_patterns(p, s, q)
+        if closure is not None:
+            keep = initial_patterns(p, s)
+            prefixes, suffixes, small = (set(patterns) for patterns in closure)
+        else:
+            prefixes, suffixes, small, keep = pattern_closure(p, s, pattern)
 
         print_set(small)
 
-        # handle symmetries if input position is "xxo"
-        if pattern == "xxo":
-            symmetries = find_symmetries_xxo(prefixes, suffixes, q)
-        # otherwise use empty symmetries
+        if lazy: # moves are built during the search
+            all_subgames, symmetries_dict = find_symmetries_dict(prefixes, suffixes, pattern, keep)
         else:
-            symmetries = empty_symmetries(prefixes, suffixes, q)
-
-        symmetries_dict = get_symmetries_dict(symmetries)
-        all_subgames = sorted(list(symmetries_dict.values()))
-
-        # build dictionary of moves from symmetries
-        game_dict = {}
-        for subgame in all_subgames:
-            children = tree.find_moves(subgame, pattern)
-            x_cleaned = tree.clean(children['x'])
-            x_simplified = tree.simplify(x_cleaned, symmetries_dict)
-            o_cleaned = tree.clean(children['o'])
-            o_simplified = tree.simplify(o_cleaned, symmetries_dict)
-
-            if conj:
-                xxo_conj_simplified = tree.simplify(tree.xxo_conjecture(subgame, pattern), symmetries_dict)
-                game_dict[subgame] = {'x': tuple(xxo_conj_simplified), 'o': tuple(o_simplified)}
-
-            else:
-                game_dict[subgame] = {'x': tuple(x_simplified), 'o': tuple(o_simplified)}
+            all_subgames, game_dict = build_game_dict(prefixes, suffixes, pattern, conj, keep)
+            if name:
+                save_game_dict(game_dict, name)
    
     # compute small game values automatically with SEGClobber
-    print("Computing base cases with SEGClobber...")
-    base_cases, small = segclobber.compute_all_base_cases(all_subgames, 
-                                                   ["".join(s) for s in small], 
-                                                   pattern, 
-                                                   14)
-    pp(base_cases)
-    pp(small)
+    cache = OutcomeCache(outcome_cache) if outcome_cache else None
+    scheduler = SolverScheduler(cache=cache)
+    base_cases, small = solve_base_cases(all_subgames, small, pattern, horizon, scheduler, window)
+    if failures is not None:
+        failures.extend(scheduler.failures)
+    if cache is not None:
+        cache.close()
+    if lazy:
+        return LazyGameDict(all_subgames, pattern, symmetries_dict, conj, small), base_cases, None
         
     # update game dictionary with small irregular games
     game_dict = add_small_positions(game_dict, small)
 
     pp(game_dict)
+    if not compiled:
+        return game_dict, base_cases, None
+
+    # intern all states and store moves as flat arrays for the compiled search engines
+    graph = compile_game_graph(game_dict, base_cases)
+    return game_dict, base_cases, graph
+
+def load_game_graph(state, pattern, p, s, name=None, moves=False, conj=False, outcome_cache=None, horizon=14, window=0, artifact_cache=None, compiled=True, closure=None):
+    '''
+    Load the compiled game graph and base cases of a run from the artifact cache, or build
+    them with build_game_graph and store them. Arguments are the same as for run.
+
+    :param compiled: return the compiled game graph; if False, None is returned in its place, and
+    the graph is only compiled to store it in the artifact cache (optional)
+    :param closure: closure of p and s passed on to build_game_graph (optional)
+
+    :returns game_dict, base_cases, graph: dictionary of moves including small positions, base cases, and compiled GameGraph
+    '''
+    artifacts = ArtifactCache(artifact_cache) if artifact_cache else None
+    key = artifact_key(state, pattern, p, s, conj, horizon, window)
+    artifact = artifacts.load(key) if artifacts is not None else None
+    if artifact is not None:
+        graph, base_cases = artifact
+        game_dict = graph.to_game_dict()
+        print(f"Loaded compiled game graph {key[:12]} from {artifacts.path(key)}")
+        if name and not moves: # as build_game_graph would, so that a later run can load it with moves=True
+            save_game_dict({subgame: children for subgame, children in game_dict.items() if "_" in subgame}, name)
+    else:
+        failures = []
+        game_dict, base_cases, graph = build_game_graph(pattern, p, s, name, moves, conj, outcome_cache, horizon, window, compiled=compiled or artifacts is not None, closure=closure, failures=failures)
+        # unknown outcomes of failed solver calls are not stored, so they are solved again on the next run
+        if artifacts is not None and (failures or "U" in base_cases.values()):
+            print(f"Game graph {key[:12]} not stored in the artifact cache: {len(failures)} solver calls failed")
+        elif artifacts is not None:
+            artifacts.store(key, graph, base_cases)
+    return game_dict, base_cases, graph if compiled else None
+
+def run(state, pattern, p, s, name=None, moves=False, conj=False, table_size=0, engine="recursive", jobs=1, outcome_cache=None, horizon=None, window=0, artifact_cache=None, proof=None, telemetry=None, telemetry_interval=1000000, ordering=(), checkpoint=None, checkpoint_interval=10000000, resume=False, lazy=False):
+    '''
+    Main function for calculating outcome class.
+
+    :param state: the starting position (e.g. "_")
+    :param pattern: the repeating pattern that "_" stands for (e.g. "xxo")
+    :param p: a set of prefixes that the position starts with (can be empty)
+    :param s: a set of suffixes that the position starts with (can be empty)
+    :param name: the name of the folder to save the output to (optional)
+    :param moves: flag to optionally load dictionary of moves (optional)
+    :param conj: flag to limit x to their leftmost move, capturing to the right (optional)
+    :param table_size: maximum number of entries in the transposition table, 0 to disable (optional)
+    :param engine: search engine to use, one of ENGINES; "scc" and "dfpn" do not use the transposition table or telemetry (optional)
+    :param jobs: number of worker processes; more than 1 searches the compiled graph in parallel (optional)
+    :param outcome_cache: path of the SQLite file caching outcome classes of small positions between runs (optional)
+    :param horizon: number of copies of q solved for each pattern, or the maximum if window is set (optional)
+    :param window: solve each pattern only until its outcomes are stable for this many copies of q, 0 to disable (optional)
+    :param artifact_cache: folder of compiled game graphs and base cases reused by runs with the same inputs (optional)
+    :param proof: file to stream the proof tree to as a DAG in JSON lines, gzip-compressed if it ends in ".gz" (optional)
+    :param telemetry: file to append live search statistics to as JSON lines; not used by the parallel search (optional)
+    :param telemetry_interval: number of nodes between telemetry records (optional)
+    :param ordering: move ordering policies from ordering.ORDERINGS, for the recursive engine only (optional)
+    :param checkpoint: file to save snapshots of the search to, for the serial iterative engine only (optional)
+    :param checkpoint_interval: number of nodes between snapshots (optional)
+    :param resume: continue the search from the snapshot in checkpoint, if there is one (optional)
+    :param lazy: build the moves of each state when the search first reaches it, for the serial recursive, scc and dfpn engines;
+    the game graph is not compiled or cached, and the game dictionary is not saved with name (optional)
+    :returns value: the outcome class of the game
+    '''
+    if ordering and (engine != "recursive" or jobs > 1):
+        raise ValueError("move ordering policies are only supported by the serial recursive engine")
+    if checkpoint and (engine != "iterative" or jobs > 1):
+        raise ValueError("checkpoints are only supported by the serial iterative engine")
+    if lazy and (engine not in ("recursive", "scc", "dfpn") or jobs > 1 or ordering or moves):
+        raise ValueError("lazy game dictionaries are only supported by the serial recursive, scc and dfpn engines, without move ordering or loaded moves")
+    if horizon is None:
+        horizon = 40 if window else 14
+    if lazy:
+        game_dict, base_cases, graph = build_game_graph(pattern, p, s, name, moves, conj, outcome_cache, horizon, window, lazy=True)
+        print(f"Game dictionary: {len(game_dict)} states, moves built on demand")
+    else:
+        # only the parallel and iterative engines search the compiled graph; the others search game_dict
+        compiled = jobs > 1 or engine == "iterative"
+        game_dict, base_cases, graph = load_game_graph(state, pattern, p, s, name, moves, conj, outcome_cache, horizon, window, artifact_cache, compiled)
+        if graph is not None:
+            graph_stats = graph.stats()
+            print(f"Compiled game graph: {graph_stats['states']} states, {graph_stats['moves']} moves, {graph_stats['bytes']} bytes")
 
     # call inductive search
     print("Evaluating outcome class...")
-    value, nodes = evaluate(state, game_dict, base_cases, 0, 0, {})
+    table = TranspositionTable(table_size) if table_size else None
+    # record the moves searched for the JSON proof tree (the parallel search cannot)
+    recorder = ProofRecorder() if name and jobs <= 1 and engine not in ("scc", "dfpn") else None
+    monitor = None
+    if telemetry and jobs <= 1:
+        monitor = Telemetry(telemetry, telemetry_interval, {"table": table} if table is not None else None)
+    snapshots = Checkpoint(checkpoint, checkpoint_interval) if checkpoint else None
+    snapshot = snapshots.load() if snapshots is not None and resume else None
+    if snapshot is not None:
+        print(f"Resuming from {checkpoint} after {snapshot['nodes']} nodes")
+    elif resume:
+        print(f"No checkpoint in {checkpoint}, starting from the beginning")
+    start = time.perf_counter()
+    if jobs > 1:
+        engine = f"parallel, {jobs} jobs"
+        value, nodes = evaluate_parallel(graph, graph.intern(state, base_cases), jobs)
+    elif engine == "iterative":
+        value, nodes = search_graph(graph, graph.intern(state, base_cases), {}, table=table, proof=recorder, telemetry=monitor, checkpoint=snapshots, resume=snapshot)
+    elif engine == "scc":
+        value, nodes = evaluate_scc(state, game_dict, base_cases, {})
+    elif engine == "dfpn":
+        value, nodes = evaluate_dfpn(state, game_dict, base_cases)
+    else:
+        policies = MoveOrdering(ordering, game_dict, base_cases) if ordering else None
+        value, nodes = evaluate(state, game_dict, base_cases, 0, 0, {}, table=table, proof=recorder, telemetry=monitor, ordering=policies)
+    print(f"Search time ({engine}): {time.perf_counter() - start:.3f}s")
+    if lazy:
+        print(f"Materialized {game_dict.materialized} of {len(game_dict)} states")
+    if snapshots is not None: # the search is finished, so there is nothing left to resume
+        snapshots.remove()
+    if monitor is not None:
+        monitor.close()
+        print(f"Telemetry: {monitor.records} records written to {telemetry}")
+    if table is not None:
+        stats = table.stats()
+        print(f"Transposition table: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries, {stats['evictions']} evictions")
 
     # periodically write status to file to log long runtimes
     write_status("result.txt", nodes, value)
 
     # optionally save state space tree as a JSON file
     if name:
-        print("Computing JSON proof tree...")
         folder = f"json/{name}"
         os.makedirs(folder, exist_ok=True)
-        proof_node = proof_tree(state, game_dict, base_cases)
+        if recorder is not None:
+            proof_node = recorder.root
+        else:
+            print("Computing JSON proof tree...")
+            proof_node = proof_tree(state, game_dict, base_cases)
         with open(f'{folder}/{name}_proof_node.json', 'w', encoding='utf-8') as f:
             json.dump(proof_node.to_json(0, 10), f, ensure_ascii=False, indent=4)
         print(f"Tree saved to {folder}/{name}_proof_node.json")
+
+    # optionally stream the full proof to a file, writing each distinct node once
+    if proof:
+        folder = os.path.dirname(proof)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        stats = export_proof(proof, state, game_dict, base_cases)
+        print(f"Proof saved to {proof}: {stats['nodes']} nodes, {stats['references']} repeated subtrees shared")
     return value, nodes
 
 if __name__ == "__main__":
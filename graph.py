@@ -0,0 +1,169 @@
+from array import array
+import struct
+from outcomes import CLASSES
+
+HEADER = struct.Struct("<8sIII") # magic, format version, number of states, length of the names
+MAGIC = b"CLOBGRPH"
+VERSION = 1
+
+PLAYERS = ("x", "o")
+
+class GameGraph:
+    '''
+    Compact form of a game dictionary. Every state is interned to an integer ID, and
+    the moves of each player are stored CSR-style: the sumgames of state i are the
+    child ID pairs (children[2k], children[2k+1]) for k in range(offsets[i], offsets[i+1]).
+    '''
+    def __init__(self):
+        self.names = [] # state ID -> position string
+        self.ids = {} # position string -> state ID
+        self.leaf = bytearray() # 1 if the state is a small position (a base case)
+        self.base = array('B') # outcome class mask from base_cases, or 0 if the state has none
+        self.offsets = {player: array('l', [0]) for player in PLAYERS}
+        self.children = {player: array('l') for player in PLAYERS}
+
+    def intern(self, state, base_cases):
+        '''
+        Return the ID of state, adding it to the graph if it is new.
+        '''
+        state_id = self.ids.get(state)
+        if state_id is None:
+            state_id = len(self.names)
+            self.ids[state] = state_id
+            self.names.append(state)
+            self.leaf.append(0 if "_" in state else 1)
+            self.base.append(CLASSES[base_cases[state]] if state in base_cases else 0)
+        return state_id
+
+    def moves(self, state_id, player):
+        '''
+        Return the list of (child1, child2) ID pairs for the moves of player in state.
+        '''
+        offsets = self.offsets[player]
+        children = self.children[player]
+        return [(children[2 * k], children[2 * k + 1]) for k in range(offsets[state_id], offsets[state_id + 1])]
+
+    def to_game_dict(self):
+        '''
+        Return the game dictionary of all states with an underscore, with moves in the same order.
+        '''
+        return {state: {player: tuple((self.names[a], self.names[b]) for a, b in self.moves(state_id, player)) for player in PLAYERS}
+                for state_id, state in enumerate(self.names) if not self.leaf[state_id]}
+
+    def to_bytes(self):
+        '''
+        Serialize the graph: a header, the names separated by newlines, the leaf and base
+        bytes, and the offsets and children of each player as little-endian 64-bit integers.
+        '''
+        names = "\n".join(self.names).encode()
+        parts = [HEADER.pack(MAGIC, VERSION, len(self.names), len(names)), names, bytes(self.leaf), self.base.tobytes()]
+        for player in PLAYERS:
+            parts.append(struct.pack("<Q", len(self.children[player])))
+            for values in (self.offsets[player], self.children[player]):
+                parts.append(array('q', values).tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        '''
+        Rebuild a graph written by to_bytes.
+        '''
+        magic, version, n, length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} game graph")
+        graph = cls()
+        position = HEADER.size
+        graph.names = data[position:position + length].decode().split("\n") if n else []
+        graph.ids = {state: state_id for state_id, state in enumerate(graph.names)}
+        position += length
+        graph.leaf = bytearray(data[position:position + n])
+        graph.base = array('B', data[position + n:position + 2 * n])
+        position += 2 * n
+        for player in PLAYERS:
+            (size,) = struct.unpack_from("<Q", data, position)
+            position += 8
+            for attribute, count in (("offsets", n + 1), ("children", size)):
+                values = array('q', data[position:position + 8 * count])
+                getattr(graph, attribute)[player] = array('l', values)
+                position += 8 * count
+        return graph
+
+    def stats(self):
+        '''
+        Number of states, moves, and bytes used by the move arrays.
+        '''
+        moves = sum(len(self.children[player]) // 2 for player in PLAYERS)
+        nbytes = len(self.leaf) + len(self.base) + sum(a.itemsize * len(a) for player in PLAYERS for a in (self.offsets[player], self.children[player]))
+        return {"states": len(self.names), "moves": moves, "bytes": nbytes}
+
+def compile_game_graph(game_dict, base_cases):
+    '''
+    Intern every state of a game dictionary and store its moves as flat arrays.
+
+    :param game_dict: dictionary of all positions and their children after all possible x and o-moves
+    :param base_cases: dictionary of all values of small positions, and inductive hypotheses for patterns
+    :returns graph: GameGraph with the same states and moves
+    '''
+    graph = GameGraph()
+    patterns = sorted(game_dict.keys())
+    for state in patterns:
+        graph.intern(state, base_cases)
+    # states without moves in game_dict (small positions) get empty move lists
+    state_id = 0
+    while state_id < len(graph.names):
+        moves = game_dict.get(graph.names[state_id], {})
+        for player in PLAYERS:
+            children = graph.children[player]
+            for sub1, sub2 in moves.get(player, []):
+                children.append(graph.intern(sub1, base_cases))
+                children.append(graph.intern(sub2, base_cases))
+            graph.offsets[player].append(len(children) // 2)
+        state_id += 1
+    return graph
+
+def strongly_connected_components(states, successors):
+    '''
+    Tarjan's algorithm with an explicit stack.
+
+    :param states: iterable of all states
+    :param successors: function returning the states a state has moves to
+    :returns components: list of lists of states, each component listed after all components it has moves to
+    '''
+    index = {} # state -> order of discovery
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    for root in states:
+        if root in index:
+            continue
+        work = [(root, iter(successors(root)))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            state, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors(child))))
+                    break
+                if child in on_stack:
+                    lowlink[state] = min(lowlink[state], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[state])
+                if lowlink[state] == index[state]: # state is the root of a component
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == state:
+                            break
+                    components.append(component)
+    return components
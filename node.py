@@ -2,6 +2,8 @@ class Node:
     '''
     Node class for each linear Clobber game state.
     '''
+    __slots__ = ("state", "value", "left_children_x", "right_children_x", "left_children_o", "right_children_o")
+
     def __init__(self, state, value):
         self.state = state
         self.value = value
@@ -0,0 +1,82 @@
+from outcomes import CLASSES, SUM, X_FEATURES, O_FEATURES, CAN_WIN, MUST_WIN
+
+# move ordering policies for prover.evaluate, combined in this order of precedence
+ORDERINGS = ("base", "history", "cheap")
+
+class MoveOrdering:
+    '''
+    Move ordering policies for the recursive search, on top of trying previously winning
+    moves (good_moves) first. Sorting is stable, so ties keep the order of the game dictionary.
+
+    "base": sumgames whose outcome, estimated from the values of their subgames in
+    base_cases (inductive hypotheses for patterns), is a win for the player to move are
+    tried first, then those that might be.
+    "history": sumgames that ended the search of a player's moves more often, in any
+    state, are tried first.
+    "cheap": the cheaper subgame of a sumgame is searched first (small positions and
+    states on the current path, then patterns with fewer moves), so that if it is U the
+    other one is skipped. Sums are commutative, so this does not change outcomes.
+    '''
+    def __init__(self, policies, game_dict, base_cases):
+        '''
+        :param policies: collection of names from ORDERINGS
+        :param game_dict: dictionary of all positions and their children after all possible x and o-moves
+        :param base_cases: dictionary of all values of small positions, and inductive hypotheses for patterns
+        '''
+        for policy in policies:
+            if policy not in ORDERINGS:
+                raise ValueError(f"unknown move ordering {policy!r}, expected one of {ORDERINGS}")
+        self.policies = set(policies)
+        self.base_cases = base_cases
+        self.history = {} # sumgame -> number of times it was a winning move
+        self.ranks = {} # (sumgame, player) -> 0 if it is estimated to win, 1 if it might, 2 otherwise
+        self.costs = {state: sum(len(sumgames) for sumgames in children.values()) for state, children in game_dict.items()}
+        self.cheap = "cheap" in self.policies
+
+    def rank(self, sumgame, player):
+        key = (sumgame, player)
+        rank = self.ranks.get(key)
+        if rank is None:
+            sub1, sub2 = sumgame
+            estimate = SUM[CLASSES[self.base_cases.get(sub1, "U")]][CLASSES[self.base_cases.get(sub2, "U")]]
+            features = (X_FEATURES if player == 'x' else O_FEATURES)[estimate]
+            rank = 0 if features & MUST_WIN else 1 if features & CAN_WIN else 2
+            self.ranks[key] = rank
+        return rank
+
+    def order(self, sumgames, player, good_moves):
+        '''
+        Sort the sumgames of a player's moves for searching.
+
+        :param sumgames: iterable of (subgame, subgame) tuples
+        :param player: "x" or "o"
+        :param good_moves: set of sumgames that were winning moves before
+        :returns: list of sumgames
+        '''
+        history = self.history if "history" in self.policies else None
+        base = "base" in self.policies
+        return sorted(sumgames, key=lambda sumgame: (
+            sumgame not in good_moves,
+            self.rank(sumgame, player) if base else 0,
+            -history.get(sumgame, 0) if history is not None else 0))
+
+    def cost(self, subgame, path_visited):
+        if "_" not in subgame or subgame in path_visited:
+            return 0
+        return 1 + self.costs.get(subgame, 0)
+
+    def summands(self, sumgame, path_visited):
+        '''
+        Return the subgames of sumgame in the order they are searched.
+        '''
+        if self.cheap:
+            sub1, sub2 = sumgame
+            if self.cost(sub2, path_visited) < self.cost(sub1, path_visited):
+                return sub2, sub1
+        return sumgame
+
+    def cutoff(self, sumgame):
+        '''
+        Record that sumgame was a winning move.
+        '''
+        self.history[sumgame] = self.history.get(sumgame, 0) + 1
@@ -0,0 +1,111 @@
+'''
+Outcome classes as bitmasks.
+
+A mask is the set of outcome classes a game might belong to, e.g. L | N for the
+sum of an L game and an N game. Sums and values are computed with small lookup
+tables instead of expanding every combination of ambiguous outcomes.
+'''
+from itertools import product
+
+L, R, N, P, U = 1, 2, 4, 8, 16
+CLASSES = {"L": L, "R": R, "N": N, "P": P, "U": U}
+NAMES = {mask: name for name, mask in CLASSES.items()}
+
+# features of the outcomes of one player's moves, combined with bitwise or
+CAN_WIN = 1 # some move might win
+MUST_WIN = 2 # some move wins in every case
+CAN_BE_UNKNOWN = 4 # some move might be unknown
+CANNOT_LOSE = 8 # some move always wins or is unknown
+
+def to_mask(outcome):
+    '''
+    Convert an outcome class (e.g. "L") or tuple of possible classes (e.g. ("L", "N")) to a mask.
+    '''
+    if type(outcome) == tuple:
+        mask = 0
+        for o in outcome:
+            mask |= CLASSES[o]
+        return mask
+    return CLASSES[outcome]
+
+def to_name(mask):
+    '''
+    Convert a mask to an outcome class, or a tuple of possible classes.
+    '''
+    if mask in NAMES:
+        return NAMES[mask]
+    return tuple(sorted(name for name, bit in CLASSES.items() if mask & bit))
+
+def _single_sum(a, b):
+    '''
+    Sum of two outcome classes (same table as prover.outcome_add).
+    '''
+    if U in (a, b):
+        return U
+    if a == P:
+        return b
+    if b == P:
+        return a
+    if a == b and a != N:
+        return a
+    if {a, b} == {L, N}:
+        return L | N
+    if {a, b} == {R, N}:
+        return R | N
+    return U
+
+def _bits(mask):
+    return [bit for bit in (L, R, N, P, U) if mask & bit]
+
+# SUM[a][b] is the mask of all possible sums of a game in a and a game in b
+SUM = [[0] * 32 for _ in range(32)]
+for a, b in product(range(1, 32), repeat=2):
+    for x, y in product(_bits(a), _bits(b)):
+        SUM[a][b] |= _single_sum(x, y)
+
+def _features(mask, wins):
+    features = 0
+    if mask & wins:
+        features |= CAN_WIN
+    if not mask & ~wins:
+        features |= MUST_WIN
+    if mask & U:
+        features |= CAN_BE_UNKNOWN
+    if not mask & ~(wins | U):
+        features |= CANNOT_LOSE
+    return features
+
+# features of a single move for x (winning outcomes L and P) and o (winning outcomes R and P)
+X_FEATURES = [_features(mask, L | P) for mask in range(32)]
+O_FEATURES = [_features(mask, R | P) for mask in range(32)]
+
+def _can_win(features):
+    '''
+    Set of possible answers (True, False or None for unknown) to "can this player win?"
+    '''
+    possible = set()
+    if features & CAN_WIN:
+        possible.add(True)
+    if features & CAN_BE_UNKNOWN and not features & MUST_WIN:
+        possible.add(None)
+    if not features & CANNOT_LOSE:
+        possible.add(False)
+    return possible
+
+# DECIDED[features] is True if the player certainly can or certainly cannot win
+DECIDED = [_can_win(f) in ({True}, {False}) for f in range(16)]
+
+# VALUE[x_features][o_features] is the outcome class (mask) of a game
+VALUE = [[U] * 16 for _ in range(16)]
+for xf, of in product(range(16), repeat=2):
+    if DECIDED[xf] and DECIDED[of]:
+        left_can_win = True in _can_win(xf)
+        right_can_win = True in _can_win(of)
+        if left_can_win and right_can_win:
+            VALUE[xf][of] = N
+        elif left_can_win:
+            VALUE[xf][of] = L
+        elif right_can_win:
+            VALUE[xf][of] = R
+        else:
+            VALUE[xf][of] = P
@@ -0,0 +1,170 @@
+import multiprocessing
+import queue
+import time
+from outcomes import CLASSES
+from search import search_graph
+
+class Donor:
+    '''
+    Search monitor for a worker process. While other workers are idle and no work is
+    queued, it donates the unsearched subgames of the shallowest frame with moves left,
+    and later collects their values if another worker has finished them.
+    '''
+    def __init__(self, graph, tasks, results, idle, interval):
+        self.graph = graph
+        self.tasks = tasks
+        self.results = results
+        self.idle = idle
+        self.interval = interval
+        self.donated = {} # state ID -> set of paths (frozensets of state IDs) it was donated with
+
+    def collect(self, state, path_visited):
+        '''
+        Return the value of a donated state if another worker has searched it on this path.
+        '''
+        path = frozenset(path_visited)
+        if path in self.donated[state]:
+            return self.results.get((state, path))
+        return None
+
+    def poll(self, stack, path_visited, nodes):
+        '''
+        Donate work if any worker is idle and there is nothing left in the queue.
+        '''
+        if self.idle.value == 0 or not self.tasks.empty():
+            return
+        path = list(path_visited)[:len(path_visited) - len(stack)] # path the search started on
+        for frame in stack:
+            path.append(frame.state)
+            remaining = frame.moves[frame.index + 1:]
+            if not remaining:
+                continue
+            donated = 0
+            children = self.graph.children[frame.player]
+            for k in remaining:
+                for child in (children[2 * k], children[2 * k + 1]):
+                    paths = self.donated.setdefault(child, set())
+                    if self.graph.leaf[child] or child in path or frozenset(path) in paths:
+                        continue
+                    paths.add(frozenset(path))
+                    self.tasks.put((child, tuple(path)))
+                    donated += 1
+            if donated:
+                return
+
+def worker(graph, tasks, results, hints, good_moves, idle, nodes, donations, done, interval):
+    '''
+    Search (state, path) tasks from the queue until told to stop. The value of the
+    task with an empty path is the answer, and is sent to done, as is any exception
+    raised by the search.
+    '''
+    try:
+        search_tasks(graph, tasks, results, hints, good_moves, idle, nodes, donations, done, interval)
+    except Exception as error:
+        done.put(error)
+
+def search_tasks(graph, tasks, results, hints, good_moves, idle, nodes, donations, done, interval):
+    '''
+    Each worker keeps its own copy of the winning moves, which it refreshes before every
+    task from the entries other workers have added to the shared log hints since, and
+    adds the moves it found to it (entries are merged as unions, so none are lost).
+    '''
+    good_moves = {k: set(v) for k, v in good_moves.items()}
+    seen = 0 # entries of hints merged so far
+    while True:
+        with idle.get_lock():
+            idle.value += 1
+        task = tasks.get()
+        with idle.get_lock():
+            idle.value -= 1
+        if task is None:
+            return
+        state, path = task
+        key = (state, frozenset(path))
+        if key in results:
+            continue
+        new = hints[seen:]
+        seen += len(new)
+        for k, moves in new:
+            good_moves.setdefault(k, set()).update(moves)
+        before = {k: len(v) for k, v in good_moves.items()}
+        path_visited = {s: depth for depth, s in enumerate(path)}
+        monitor = Donor(graph, tasks, results, idle, interval)
+        value, task_nodes = search_graph(graph, state, good_moves, path_visited, monitor=monitor)
+        results[key] = CLASSES[value]
+        found = [(k, frozenset(v)) for k, v in good_moves.items() if len(v) != before.get(k, 0)]
+        if found:
+            hints.extend(found)
+        with nodes.get_lock():
+            nodes.value += task_nodes
+        with donations.get_lock():
+            donations.value += sum(len(paths) for paths in monitor.donated.values())
+        if not path:
+            done.put(value)
+
+def wait(done, workers, timeout=1):
+    '''
+    Wait for the answer on done, raising the exception of a worker that failed, or
+    an error if a worker exited without sending one (e.g. because it was killed).
+    '''
+    while True:
+        try:
+            answer = done.get(timeout=timeout)
+        except queue.Empty:
+            exited = [p for p in workers if p.exitcode is not None]
+            if not exited:
+                continue
+            try: # a worker that raised exits right after sending its exception
+                answer = done.get(timeout=timeout)
+            except queue.Empty:
+                raise RuntimeError(f"worker process exited with code {exited[0].exitcode}") from None
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+def evaluate_parallel(graph, root, jobs, good_moves=None, interval=10000, stats=None):
+    '''
+    Compute the outcome class of a state of a compiled GameGraph with a pool of worker
+    processes. Workers with work to spare hand sumgame branches from anywhere in their
+    search to idle workers, keyed by the path they are searched on, so the outcome is
+    the same as that of search_graph.
+
+    :param graph: compiled GameGraph
+    :param root: ID of the starting position
+    :param jobs: number of worker processes
+    :param good_moves: dictionary of winning move indices to start from, keyed by (state ID, player) (optional)
+    :param interval: number of nodes between checks for idle workers (optional)
+    :param stats: dictionary to store the number of tasks donated to idle workers in, under "donated" (optional)
+    :returns value, nodes: outcome class of position and total number of nodes visited by all workers
+    '''
+    if jobs <= 1:
+        if stats is not None:
+            stats["donated"] = 0
+        return search_graph(graph, root, good_moves if good_moves is not None else {})
+    with multiprocessing.Manager() as manager:
+        tasks = multiprocessing.Queue()
+        done = multiprocessing.Queue()
+        results = manager.dict()
+        hints = manager.list() # log of (key, moves) found by the workers
+        idle = multiprocessing.Value('i', 0)
+        nodes = multiprocessing.Value('q', 0)
+        donations = multiprocessing.Value('q', 0)
+        workers = [multiprocessing.Process(target=worker, args=(graph, tasks, results, hints, good_moves or {}, idle, nodes, donations, done, interval)) for _ in range(jobs)]
+        for p in workers:
+            p.start()
+        try:
+            while idle.value < jobs and all(p.exitcode is None for p in workers): # so that work is donated from the start
+                time.sleep(0.001)
+            tasks.put((root, ()))
+            value = wait(done, workers)
+            total = nodes.value
+            if stats is not None:
+                stats["donated"] = donations.value
+            if good_moves is not None:
+                for k, moves in hints:
+                    good_moves.setdefault(k, set()).update(moves)
+        finally:
+            for p in workers:
+                p.terminate()
+                p.join()
+        return value, total
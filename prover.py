@@ -1,9 +1,8 @@
-from pprint import pp
 from collections import defaultdict
 from json import dumps, dump
 from node import Node
 from itertools import product
-from functools import lru_cache
+from outcomes import CLASSES, NAMES, SUM, X_FEATURES, O_FEATURES, MUST_WIN, DECIDED, VALUE, U
 
 def proof_tree(state, game_dict, base_cases, path_visited=None):
     '''
@@ -30,45 +29,34 @@ def proof_tree(state, game_dict, base_cases, path_visited=None):
     # recursively evaluate all options
     left_children_x = [] # child nodes
     right_children_x = [] # child nodes
-    x_values = set() # all outcome classes resulting from x-moves
+    x_features = 0 # combined outcome classes resulting from x-moves (see outcomes.py)
 
     # iterate through all subgames resulting from an x-move
     for sub1, sub2 in game_dict[state].get('x', []):
         child1 = proof_tree(sub1, game_dict, base_cases, path_visited) 
         child2 = proof_tree(sub2, game_dict, base_cases, path_visited)
-        result = outcome_add_cached(child1.value, child2.value) # compute the sum of outcome classes
-        x_values.add(result)
+        result = SUM[CLASSES[child1.value]][CLASSES[child2.value]] # compute the sum of outcome classes
+        x_features |= X_FEATURES[result]
         left_children_x.append(child1) 
         right_children_x.append(child2)
-        if result in ["L", "P"]: # if we find a winning move, stop searching
+        if x_features & MUST_WIN: # if we find a winning move, stop searching
             break
 
     left_children_o = [] # child nodes
     right_children_o = [] # child nodes
-    o_values = set() # all outcome classes resulting from o-moves
+    o_features = 0 # combined outcome classes resulting from o-moves
     for sub1, sub2 in game_dict[state].get('o', []):
         child1 = proof_tree(sub1, game_dict, base_cases, path_visited)
         child2 = proof_tree(sub2, game_dict, base_cases, path_visited)
-        result = outcome_add_cached(child1.value, child2.value)
-        o_values.add(result)
+        result = SUM[CLASSES[child1.value]][CLASSES[child2.value]]
+        o_features |= O_FEATURES[result]
         left_children_o.append(child1)
         right_children_o.append(child2)
-        if result in ["R", "P"]:
+        if o_features & MUST_WIN:
             break
 
-    # since L + N in {L, N}, we compute outcomes assuming each possibility
-    values = []
-    # expand all possible outcome combinations
-    for expanded_x_values in expand_outcomes_cached(tuple(x_values)): 
-        for expanded_o_values in expand_outcomes_cached(tuple(o_values)):
-            value = compute_value_cached(tuple(expanded_x_values), tuple(expanded_o_values))
-            values.append(value)
-
-    # if all combinations lead to the same outcome, return that outcome
-    if len(set(values)) == 1:
-        value = values[0]
-    else:
-        value = "U" # otherwise, return unknown
+    # the outcome is known only if it is the same for every combination of possible outcomes
+    value = NAMES[VALUE[x_features][o_features]]
 
     # add children to node
     node = Node(state, value)
@@ -81,7 +69,51 @@ def proof_tree(state, game_dict, base_cases, path_visited=None):
 
     return node
 
-def evaluate(state, game_dict, base_cases, depth, nodes, good_moves, path_visited=None):
+class ProofRecorder:
+    '''
+    Builds the tree of Nodes of the moves a search actually tries, while it runs, so
+    that no second search with proof_tree is needed. The searches call leaf() for
+    states whose value is known (small positions, inductive hypotheses, and values
+    reused from a transposition table, which get no children), enter() and leave()
+    around expanded states, and move() after each sumgame. A subgame that was not
+    searched because the other one is U gets the value None.
+    '''
+    def __init__(self):
+        self.stack = [] # (node, finished child nodes) for each state being expanded
+        self.root = None
+
+    def finish(self, node):
+        if self.stack:
+            self.stack[-1][1].append(node)
+        else:
+            self.root = node
+
+    def leaf(self, state, value):
+        self.finish(Node(state, NAMES[value]))
+
+    def enter(self, state):
+        self.stack.append((Node(state, None), []))
+
+    def move(self, player, skipped=None):
+        '''
+        Attach the last two finished subgames as a move of player, or the last one and skipped.
+        '''
+        node, finished = self.stack[-1]
+        child2 = Node(skipped, None) if skipped is not None else finished.pop()
+        child1 = finished.pop()
+        if player == 'x':
+            node.left_children_x.append(child1)
+            node.right_children_x.append(child2)
+        else:
+            node.left_children_o.append(child1)
+            node.right_children_o.append(child2)
+
+    def leave(self, value):
+        node, finished = self.stack.pop()
+        node.value = NAMES[value]
+        self.finish(node)
+
+def evaluate(state, game_dict, base_cases, depth, nodes, good_moves, path_visited=None, table=None, proof=None, telemetry=None, ordering=None):
     '''
     Compute the outcome class.
 
@@ -90,70 +122,130 @@ def evaluate(state, game_dict, base_cases, depth, nodes, good_moves, path_visite
     :param base_cases: dictionary of all values of small positions, and inductive hypotheses for patterns
     :param depth: integer tracking the maximum depth
     :param nodes: total number of nodes visited
+    :param table: optional TranspositionTable for reusing values of previously searched states
+    :param proof: optional ProofRecorder that builds the tree of the moves searched
+    :param telemetry: optional telemetry.Telemetry that writes live search statistics instead of the status report
+    :param ordering: optional ordering.MoveOrdering deciding the order of moves and subgames to search
     :returns value: outcome class of position
     '''
+    if path_visited is None:
+        path_visited = {}
+    if telemetry is not None:
+        telemetry.describe = lambda s: (s, len(game_dict[s].get('x', ())), len(game_dict[s].get('o', ())))
+    value, nodes = evaluate_masks(state, game_dict, base_cases, depth, nodes, good_moves, path_visited, table, proof, telemetry, ordering)
+    if telemetry is not None:
+        telemetry.report(nodes, len(path_visited), done=True)
+    return NAMES[value], nodes
+
+def evaluate_masks(state, game_dict, base_cases, depth, nodes, good_moves, path_visited, table, proof=None, telemetry=None, ordering=None):
+    '''
+    Recursive search behind evaluate(), with outcome classes represented as masks (see outcomes.py).
+    '''
     nodes += 1
-    if nodes % 10000000 == 0:
+    if telemetry is not None:
+        if nodes % telemetry.interval == 0:
+            telemetry.report(nodes, len(path_visited))
+    elif nodes % 10000000 == 0:
         print(nodes)
-        pp(good_moves)
         write_status("result.txt", nodes) # log status to file
 
-    if path_visited is None:
-        path_visited = {}
-
     if "_" not in state:
-        return base_cases[state], nodes
+        if proof is not None:
+            proof.leaf(state, CLASSES[base_cases[state]])
+        return CLASSES[base_cases[state]], nodes
 
     # if we visited this node, apply inductive hypothesis
     if state in path_visited:
         depth_diff = depth - path_visited[state]
         #print(f"state: {state}")
         #print(f"difference in depth: {depth_diff}")
-        return base_cases[state], nodes
+        if table is not None:
+            table.depend(state)
+        if telemetry is not None:
+            telemetry.hypotheses += 1
+        if proof is not None:
+            proof.leaf(state, CLASSES[base_cases[state]])
+        return CLASSES[base_cases[state]], nodes
+
+    # reuse the value of a previous search if it does not conflict with the current path
+    if table is not None:
+        value = table.lookup(state, path_visited)
+        if value is not None:
+            if proof is not None:
+                proof.leaf(state, value)
+            return value, nodes
+        table.enter()
 
     # mark this node as visited along the current path
     path_visited[state] = depth
+    if telemetry is not None:
+        telemetry.expand(state, depth)
+    if proof is not None:
+        proof.enter(state)
 
-    # recursively evaluate all options (same functionality as above)
-    x_values = set()
+    # recursively evaluate all options, combining the outcomes of x-moves into x_features
+    x_features = 0
     if (state, 'x') not in good_moves.keys():
         good_moves[(state, 'x')] = set()
-    sorted_subgames = sort_subgames(game_dict[state].get('x', []), good_moves[(state, 'x')])
-    for sub1, sub2 in sorted_subgames:
-        val1, nodes = evaluate(sub1, game_dict, base_cases, depth+1, nodes, good_moves, path_visited)
-        val2, nodes = evaluate(sub2, game_dict, base_cases, depth+1, nodes, good_moves, path_visited)
-        result = outcome_add_cached(val1, val2)
-        x_values.add(result)
-        if result in ["L", "P"]:
-            good_moves[(state, 'x')].add((sub1, sub2))
-            break
-
-    o_values = set()
-    if (state, 'o') not in good_moves:
-        good_moves[(state, 'o')] = set()
-    sorted_subgames = sort_subgames(game_dict[state].get('o', []), good_moves[(state, 'o')])
-    for sub1, sub2 in sorted_subgames:
-        val1, nodes = evaluate(sub1, game_dict, base_cases, depth+1, nodes, good_moves, path_visited)
-        val2, nodes = evaluate(sub2, game_dict, base_cases, depth+1, nodes, good_moves, path_visited)
-        result = outcome_add_cached(val1, val2)
-        o_values.add(result)
-        if result in ["R", "P"]:
-            good_moves[(state, 'o')].add((sub1, sub2))
+    if ordering is None:
+        sorted_subgames = sort_subgames(game_dict[state].get('x', []), good_moves[(state, 'x')])
+    else:
+        sorted_subgames = ordering.order(game_dict[state].get('x', []), 'x', good_moves[(state, 'x')])
+    for sumgame in sorted_subgames:
+        sub1, sub2 = sumgame if ordering is None else ordering.summands(sumgame, path_visited)
+        val1, nodes = evaluate_masks(sub1, game_dict, base_cases, depth+1, nodes, good_moves, path_visited, table, proof, telemetry, ordering)
+        if val1 == U: # U + anything is U, so skip the second subgame
+            result = U
+        else:
+            val2, nodes = evaluate_masks(sub2, game_dict, base_cases, depth+1, nodes, good_moves, path_visited, table, proof, telemetry, ordering)
+            result = SUM[val1][val2]
+        if telemetry is not None:
+            telemetry.sumgames += 1
+        if proof is not None:
+            proof.move('x', sub2 if val1 == U else None)
+        x_features |= X_FEATURES[result]
+        if x_features & MUST_WIN:
+            good_moves[(state, 'x')].add(sumgame)
+            if ordering is not None:
+                ordering.cutoff(sumgame)
             break
 
-    # compute outcome class (same as above)
-    values = []
-    for expanded_x_values in expand_outcomes_cached(tuple(x_values)):
-        for expanded_o_values in expand_outcomes_cached(tuple(o_values)):
-            value = compute_value_cached(tuple(expanded_x_values), tuple(expanded_o_values))
-            values.append(value)
-
-    if len(set(values)) == 1:
-        value = values[0]
+    # if it is unknown whether x can win, the outcome is unknown whatever o can do
+    if DECIDED[x_features]:
+        o_features = 0
+        if (state, 'o') not in good_moves:
+            good_moves[(state, 'o')] = set()
+        if ordering is None:
+            sorted_subgames = sort_subgames(game_dict[state].get('o', []), good_moves[(state, 'o')])
+        else:
+            sorted_subgames = ordering.order(game_dict[state].get('o', []), 'o', good_moves[(state, 'o')])
+        for sumgame in sorted_subgames:
+            sub1, sub2 = sumgame if ordering is None else ordering.summands(sumgame, path_visited)
+            val1, nodes = evaluate_masks(sub1, game_dict, base_cases, depth+1, nodes, good_moves, path_visited, table, proof, telemetry, ordering)
+            if val1 == U:
+                result = U
+            else:
+                val2, nodes = evaluate_masks(sub2, game_dict, base_cases, depth+1, nodes, good_moves, path_visited, table, proof, telemetry, ordering)
+                result = SUM[val1][val2]
+            if telemetry is not None:
+                telemetry.sumgames += 1
+            if proof is not None:
+                proof.move('o', sub2 if val1 == U else None)
+            o_features |= O_FEATURES[result]
+            if o_features & MUST_WIN:
+                good_moves[(state, 'o')].add(sumgame)
+                if ordering is not None:
+                    ordering.cutoff(sumgame)
+                break
+        value = VALUE[x_features][o_features]
     else:
-        value = "U"
+        value = U
 
     path_visited.pop(state)
+    if table is not None:
+        table.leave(state, value)
+    if proof is not None:
+        proof.leave(value)
 
     return value, nodes
 
@@ -162,20 +254,6 @@ def sort_subgames(all_moves, good_moves):
     all_moves.sort(key=lambda t: t not in good_moves)
     return all_moves
 
-# caching specific, frequently used function calls to speed up runtime of evaluate()
-@lru_cache(None)
-def outcome_add_cached(a, b):
-    return outcome_add(a, b)
-
-@lru_cache(None)
-def expand_outcomes_cached(values_tuple):
-    return expand_outcomes(list(values_tuple))
-
-@lru_cache(None)
-def compute_value_cached(left, right):
-    position = {"left": list(left), "right": list(right)}
-    return compute_value(position)
-
 def expand_outcomes(outcome_list):
     '''
     Given a list of outcomes, and possible outcomes (e.g. [L, N]), compute all possible 
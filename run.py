@@ -1,5 +1,8 @@
 import argparse
+import batch
 import generator
+import segclobber
+from ordering import ORDERINGS
 
 def parse(l):
     output = set()
@@ -16,11 +19,48 @@ def main():
     parser.add_argument("--prefixes", nargs="+", default=[], help="Set of prefixes")
     parser.add_argument("--suffixes", nargs="+", default=[], help="Set of suffixes")
     parser.add_argument("--json", type=str, metavar="FOLDER", help="Produce JSON output in the given folder")
+    parser.add_argument("--proof", metavar="FILE", help="Stream the whole proof tree to FILE as a DAG in JSON lines (gzip-compressed if FILE ends in .gz)")
     parser.add_argument("--conj", default=False, help="Test conjecture that x can win by making leftmost move")
+    parser.add_argument("--engine", choices=generator.ENGINES, default="recursive", help="Search engine used to evaluate the outcome class")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes for the search")
+    parser.add_argument("--outcome-cache", default="cache/outcomes.sqlite", metavar="FILE", help="SQLite file caching outcome classes of small positions between runs")
+    parser.add_argument("--no-outcome-cache", action="store_true", help="Do not read or write the outcome cache")
+    parser.add_argument("--artifact-cache", default="cache/artifacts", metavar="FOLDER", help="Folder of compiled game graphs and base cases reused by reruns with the same inputs")
+    parser.add_argument("--no-artifact-cache", action="store_true", help="Always rebuild the game graph and base cases")
+    parser.add_argument("--moves", action="store_true", help="Load the dictionary of moves saved by an earlier run with the same --json folder")
+    parser.add_argument("--backend", choices=segclobber.BACKENDS, default=segclobber.backend, help="Solver for small positions: SEGClobber binary, in-process Python solver, or auto (binary if it runs here)")
+    parser.add_argument("--horizon", type=int, help="Copies of q solved for each pattern's base cases (default 14), or the maximum with --window (default 40)")
+    parser.add_argument("--window", type=int, default=0, help="Solve base cases only until outcomes are stable for this many copies of q (0 solves a fixed horizon)")
+    parser.add_argument("--telemetry", metavar="FILE", help="Append live search statistics to FILE as JSON lines")
+    parser.add_argument("--telemetry-interval", type=int, default=1000000, metavar="NODES", help="Nodes between telemetry records")
+    parser.add_argument("--ordering", nargs="+", choices=ORDERINGS, default=[], help="Move ordering policies for the recursive engine: base (estimated winning moves first), history (moves that won elsewhere first), cheap (cheaper subgame of a sum first)")
+    parser.add_argument("--checkpoint", metavar="FILE", help="Save a snapshot of the search to FILE every --checkpoint-interval nodes (iterative engine only)")
+    parser.add_argument("--checkpoint-interval", type=int, default=10000000, metavar="NODES", help="Nodes between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="Continue the search from the snapshot in --checkpoint FILE")
+    parser.add_argument("--batch", metavar="FILE", help="Solve the families in FILE (JSON lines with state, q, prefixes, suffixes, conj) with --jobs worker processes")
+    parser.add_argument("--batch-output", default="batch_results.jsonl", metavar="FILE", help="JSON lines file the --batch results are streamed to")
+    parser.add_argument("--lazy", action="store_true", help="Build the moves of each state when the search first reaches it (recursive, scc and dfpn engines only, no game graph or artifact cache)")
+    parser.add_argument("--table-size", type=int, default=0, help="Maximum entries in the transposition table (0 disables it)")
 
     args = parser.parse_args()
+    if args.ordering and (args.engine != "recursive" or args.jobs > 1):
+        parser.error("--ordering is only supported by the recursive engine with --jobs 1")
+    if args.checkpoint and (args.engine != "iterative" or args.jobs > 1):
+        parser.error("--checkpoint is only supported by the iterative engine with --jobs 1")
+    if args.lazy and (args.engine not in ("recursive", "scc", "dfpn") or args.jobs > 1 or args.ordering or args.moves):
+        parser.error("--lazy is only supported by the recursive, scc and dfpn engines with --jobs 1, without --ordering or --moves")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs the --checkpoint FILE to resume from")
+    segclobber.set_backend(args.backend)
 
-    outcome, nodes = generator.run(args.state, args.q, parse(args.prefixes), parse(args.suffixes), args.json, conj=args.conj)
+    if args.batch:
+        records = batch.run_batch(batch.read_specs(args.batch, args.horizon, args.window), args.batch_output, jobs=args.jobs, engine=args.engine,
+                                  outcome_cache=None if args.no_outcome_cache else args.outcome_cache,
+                                  artifact_cache=None if args.no_artifact_cache else args.artifact_cache)
+        print(f"Solved {sum('error' not in record for record in records)} of {len(records)} families, results saved to {args.batch_output}")
+        return
+
+    outcome, nodes = generator.run(args.state, args.q, parse(args.prefixes), parse(args.suffixes), args.json, moves=args.moves, conj=args.conj, table_size=args.table_size, engine=args.engine, jobs=args.jobs, outcome_cache=None if args.no_outcome_cache else args.outcome_cache, horizon=args.horizon, window=args.window, artifact_cache=None if args.no_artifact_cache else args.artifact_cache, proof=args.proof, telemetry=args.telemetry, telemetry_interval=args.telemetry_interval, ordering=args.ordering, checkpoint=args.checkpoint, checkpoint_interval=args.checkpoint_interval, resume=args.resume, lazy=args.lazy)
     print(f"Outcome class: {outcome}")
     print(f"Nodes visited: {nodes}")
 
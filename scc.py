@@ -0,0 +1,97 @@
+from graph import strongly_connected_components
+from outcomes import CLASSES, NAMES, SUM, X_FEATURES, O_FEATURES, MUST_WIN, DECIDED, VALUE, U
+from prover import evaluate_masks, sort_subgames
+
+def resolve(state, game_dict, base_cases, values, good_moves):
+    '''
+    Outcome class mask of a state from the values of its subgames, which are all known:
+    small positions, states of components searched before, and the state itself (a move
+    back to it uses its inductive hypothesis, as on the search path). Moves are tried in
+    the same order as evaluate_masks, stopping at the first winning one.
+    '''
+    def value_of(subgame):
+        if "_" not in subgame or subgame == state:
+            return CLASSES[base_cases[subgame]]
+        return values[subgame]
+
+    features = {}
+    for player, player_features in (('x', X_FEATURES), ('o', O_FEATURES)):
+        features[player] = 0
+        if player == 'o' and not DECIDED[features['x']]:
+            return U # unknown whatever o can do
+        moves = good_moves.setdefault((state, player), set())
+        for sumgame in sort_subgames(game_dict[state].get(player, []), moves):
+            sub1, sub2 = sumgame
+            val1 = value_of(sub1)
+            result = U if val1 == U else SUM[val1][value_of(sub2)]
+            features[player] |= player_features[result]
+            if features[player] & MUST_WIN:
+                moves.add(sumgame)
+                break
+    return VALUE[features['x']][features['o']]
+
+class Resolved:
+    '''
+    Values of the states of components searched before, in place of a TranspositionTable
+    for evaluate_masks, so that the search of a component stops at them. Values inside a
+    component depend on the path and are not stored.
+    '''
+    def __init__(self, values):
+        self.values = values
+
+    def lookup(self, state, path_visited):
+        return self.values.get(state)
+
+    def enter(self):
+        pass
+
+    def depend(self, ancestor):
+        pass
+
+    def leave(self, state, value):
+        pass
+
+def evaluate_scc(state, game_dict, base_cases, good_moves=None):
+    '''
+    Compute the outcome class by splitting the states reachable from state into strongly
+    connected components. A state's value only depends on which states of its own
+    component are on the search path, since no other state on the path can be reached
+    from it. Components are handled after all components they have moves to: a state
+    outside any cycle is resolved once from the values of its subgames, and a component
+    with a cycle is searched with evaluate_masks from each of its states that is entered
+    from outside, with an empty path, stopping at the states of earlier components.
+
+    :param state: starting position (e.g. "_")
+    :param game_dict: dictionary of all positions and their children after all possible x and o-moves
+    :param base_cases: dictionary of all values of small positions, and inductive hypotheses for patterns
+    :param good_moves: dictionary of winning moves found so far, keyed by (state, player) (optional)
+    :returns value, nodes: outcome class of position, and number of states resolved plus nodes searched in components
+    '''
+    if good_moves is None:
+        good_moves = {}
+    if "_" not in state:
+        return base_cases[state], 1
+
+    def successors(s):
+        return [g for moves in game_dict[s].values() for sumgame in moves for g in sumgame if "_" in g and g != s]
+
+    components = strongly_connected_components([state], successors)
+    component = {s: i for i, members in enumerate(components) for s in members}
+    # states with moves into them from other components, where a search of their component starts
+    entered = {state} | {g for s in component for g in successors(s) if component[g] != component[s]}
+
+    values = {} # state -> mask of its value with none of its component on the path
+    resolved = Resolved(values)
+    nodes = 0
+    for members in components:
+        if len(members) == 1:
+            values[members[0]] = resolve(members[0], game_dict, base_cases, values, good_moves)
+            nodes += 1
+            continue
+        # values are only stored once the whole component is searched, so no search reuses them
+        component_values = {}
+        for entry in members:
+            if entry in entered:
+                component_values[entry], nodes = evaluate_masks(entry, game_dict, base_cases, 0, nodes, good_moves, {}, resolved)
+        values.update(component_values)
+    return NAMES[values[state]], nodes
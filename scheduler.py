@@ -0,0 +1,139 @@
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import os
+import segclobber
+from cache import canonicalize, SWAP_OUTCOME
+from components import split_components, combine
+from solver import normalize
+
+class SolverScheduler:
+    '''
+    Runs SEGClobber on many positions at once. Identical positions are solved once,
+    calls run concurrently in a bounded pool of threads (each waiting on a solver
+    process) with the longest positions first, and calls that time out or fail are
+    retried. A position that still cannot be solved gets the outcome class "U".
+    Positions found in the optional OutcomeCache are not solved again. With the in-process
+    backend (see segclobber.BACKENDS) positions are solved one after another instead.
+    '''
+    def __init__(self, workers=None, timeout=100, retries=2, cache=None, reduce=True):
+        '''
+        :param workers: maximum number of concurrent solver processes (default: number of CPUs)
+        :param timeout: seconds before a solver call is abandoned; doubled on each retry
+        :param retries: number of times a failed call is retried
+        :param cache: OutcomeCache shared between runs (optional)
+        :param reduce: split positions into components and solve them in canonical form (see solve)
+        '''
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.retries = retries
+        self.calls = 0 # solver processes started
+        self.lock = threading.Lock()
+        self.failures = [] # (position, player, error) for calls that failed after all retries
+        self.requested = 0 # positions requested, including duplicates
+        self.solved = {} # position -> outcome class
+        self.forms = {} # position given to the solver or cache -> outcome class
+        self.cache = cache
+        self.reduce = reduce
+
+    def call(self, position, player):
+        '''
+        Run the solver for one position and player to move, retrying on timeouts and errors.
+        Returns True if the player to move wins, or None if the solver failed.
+        '''
+        timeout = self.timeout
+        for attempt in range(self.retries + 1):
+            with self.lock:
+                self.calls += 1
+            try:
+                return segclobber.segclobber(position, player, timeout=timeout) == player
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, IndexError) as error:
+                last_error = error
+                timeout *= 2
+        self.failures.append((position, player, repr(last_error)))
+        return None
+
+    def solve(self, positions):
+        '''
+        Compute the outcome classes of a collection of xo-strings. With reduce, positions are
+        split into components (see components.split_components), dropping dead stones, and
+        each component is solved once in canonical form (see cache.canonicalize). Positions
+        whose outcome the outcome classes of their components determine are not solved; the
+        others are solved as the sum of their remaining components.
+
+        :param positions: iterable of positions (e.g. ["xxo", "oxo", "xxo"])
+        :returns result: dictionary mapping each position to its outcome class
+        '''
+        positions = list(positions)
+        self.requested += len(positions)
+        todo = {p for p in positions if p not in self.solved}
+        if not self.reduce:
+            self.solve_forms(todo)
+            self.solved.update({p: self.forms[p] for p in todo})
+            return {position: self.solved[position] for position in positions}
+
+        parts = {position: split_components(position) for position in todo}
+        outcomes = self.solve_canonical({c for components in parts.values() for c in components})
+        remainders = {} # position -> its sum of components, for positions combine() leaves open
+        for position, components in parts.items():
+            value = combine(outcomes[c] for c in components)
+            if value is None:
+                remainders[position] = ".".join(normalize(components))
+            else:
+                self.solved[position] = value
+        whole = self.solve_canonical(set(remainders.values()))
+        for position, remainder in remainders.items():
+            self.solved[position] = whole[remainder]
+        return {position: self.solved[position] for position in positions}
+
+    def solve_canonical(self, positions):
+        '''
+        Outcome classes of positions, solving only their canonical forms.
+
+        :returns result: dictionary mapping each position to its outcome class
+        '''
+        canonical = {position: canonicalize(position) for position in positions}
+        self.solve_forms({form for form, swapped in canonical.values()})
+        return {position: SWAP_OUTCOME[self.forms[form]] if swapped else self.forms[form] for position, (form, swapped) in canonical.items()}
+
+    def solve_forms(self, positions):
+        '''
+        Solve positions exactly as given, storing their outcome classes in self.forms.
+        '''
+        todo = sorted({p for p in positions if p not in self.forms}, key=len, reverse=True)
+        for position in todo:
+            if position == "": # catch the empty game
+                self.forms[position] = "P"
+        if self.cache is not None:
+            self.forms.update(self.cache.get_many(p for p in todo if p))
+            todo = [p for p in todo if p not in self.forms]
+        if segclobber.resolve_backend() == "python": # solved in process, sharing one transposition table
+            for position in todo:
+                if position:
+                    self.calls += 1
+                    self.forms[position] = segclobber.get_outcome_class(position)
+        else:
+            jobs = [(position, player) for position in todo if position for player in ["B", "W"]]
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                wins = pool.map(lambda job: self.call(job[0].replace("x", "B").replace("o", "W"), job[1]), jobs)
+                wins = dict(zip(jobs, wins))
+            for position in todo:
+                if position:
+                    self.forms[position] = segclobber.outcome_from_wins(wins[(position, "B")], wins[(position, "W")])
+        if self.cache is not None:
+            self.cache.put_many({p: self.forms[p] for p in todo if p})
+
+    def stats(self):
+        '''
+        Summary of solver usage.
+        '''
+        stats = {
+            "requested": self.requested,
+            "unique": len(self.solved),
+            "forms": len(self.forms),
+            "calls": self.calls,
+            "failures": len(self.failures)
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
@@ -0,0 +1,225 @@
+from prover import write_status
+from outcomes import NAMES, SUM, X_FEATURES, O_FEATURES, MUST_WIN, DECIDED, VALUE, U
+from graph import compile_game_graph
+from checkpoint import graph_digest
+
+class Frame:
+    '''
+    A state being expanded by the iterative search, with a cursor into its move list.
+    '''
+    __slots__ = ("state", "depth", "player", "moves", "end", "index", "val1", "x_features", "o_features")
+
+    def __init__(self, state, depth):
+        self.state = state # state ID
+        self.depth = depth
+        self.player = None # player whose moves are being searched
+        self.moves = () # sorted move indices for the current player
+        self.end = 0 # number of moves for the current player
+        self.index = 0 # position in moves of the sumgame being searched
+        self.val1 = None # value (mask) of the first subgame of the current sumgame
+        self.x_features = 0 # combined outcomes of x-moves (see outcomes.py)
+        self.o_features = 0 # combined outcomes of o-moves
+
+def start_moves(frame, player, graph, good_moves):
+    '''
+    Point frame at the moves of player, with previously winning moves first.
+    '''
+    offsets = graph.offsets[player]
+    moves = range(offsets[frame.state], offsets[frame.state + 1])
+    good = good_moves.get((frame.state, player))
+    if good:
+        moves = sorted(moves, key=lambda k: k not in good)
+    frame.player = player
+    frame.moves = moves
+    frame.end = len(moves)
+    frame.index = 0
+    frame.val1 = None
+
+def search_graph(graph, root, good_moves, path_visited=None, table=None, monitor=None, proof=None, telemetry=None, checkpoint=None, resume=None):
+    '''
+    Compute the outcome class of a state of a compiled GameGraph with an explicit stack
+    instead of recursion. Visits the same nodes in the same order as prover.evaluate.
+
+    :param graph: compiled GameGraph
+    :param root: ID of the starting position
+    :param good_moves: dictionary of winning move indices found so far, keyed by (state ID, player)
+    :param path_visited: dictionary of state IDs on the current path and their depths (optional)
+    :param table: optional TranspositionTable for reusing values of previously searched states
+    :param monitor: optional object whose poll(stack, path_visited, nodes) method is called every
+    monitor.interval nodes, and whose collect(state, path_visited) method supplies values of the
+    states in monitor.donated that were searched elsewhere
+    :param proof: optional prover.ProofRecorder that builds the tree of the moves searched
+    :param telemetry: optional telemetry.Telemetry that writes live search statistics every
+    telemetry.interval nodes (or monitor.interval, if both are given) instead of the status report
+    :param checkpoint: optional checkpoint.Checkpoint that a snapshot of the search is saved to every checkpoint.interval nodes
+    :param resume: snapshot loaded from a Checkpoint to continue the search from; path_visited, good_moves,
+    and the table and proof recorder (if given) are restored in place
+    :returns value, nodes: outcome class of position and total number of nodes visited
+    '''
+    if path_visited is None:
+        path_visited = {}
+    if monitor is not None:
+        interval = monitor.interval
+    elif telemetry is not None:
+        interval = telemetry.interval
+    else:
+        interval = 10000000
+    donated = None if monitor is None else monitor.donated
+    visits = None
+    if telemetry is not None:
+        visits = telemetry.visits = [0] * len(graph.names)
+        offsets = graph.offsets
+        telemetry.describe = lambda s: (graph.names[s], offsets['x'][s + 1] - offsets['x'][s], offsets['o'][s + 1] - offsets['o'][s])
+    hypotheses = expansions = sumgames = max_depth = 0 # telemetry counters
+    leaf = graph.leaf
+    base = graph.base
+    children = graph.children
+    stack = []
+    nodes = 0
+    child, depth = root, 0
+    digest = graph_digest(graph) if checkpoint is not None or resume is not None else None
+    if resume is not None:
+        if resume["graph"] != digest or resume["root"] != root:
+            raise ValueError("the checkpoint was taken on a different game graph or starting position")
+        nodes, child, depth, stack = resume["nodes"], resume["child"], resume["depth"], resume["stack"]
+        path_visited.clear()
+        path_visited.update(resume["path_visited"])
+        good_moves.clear()
+        good_moves.update(resume["good_moves"])
+        if table is not None and resume["table"] is not None:
+            vars(table).update(vars(resume["table"]))
+        if proof is not None and resume["proof"] is not None:
+            vars(proof).update(vars(resume["proof"]))
+        hypotheses, expansions, sumgames, max_depth = resume["counters"]
+        if visits is not None and resume["visits"] is not None:
+            visits[:] = resume["visits"]
+    report = nodes - nodes % interval + interval # node count of the next status report
+    save = None if checkpoint is None else nodes - nodes % checkpoint.interval + checkpoint.interval # and of the next snapshot
+    event = report if save is None else min(report, save)
+    while True:
+        # visit child (same as the start of prover.evaluate)
+        nodes += 1
+        if nodes == event:
+            if nodes == report:
+                report += interval
+                if telemetry is not None:
+                    telemetry.count(hypotheses, expansions, sumgames, max_depth)
+                    telemetry.report(nodes, len(path_visited))
+                if monitor is not None:
+                    monitor.poll(stack, path_visited, nodes)
+                elif telemetry is None:
+                    print(nodes)
+                    write_status("result.txt", nodes)
+            if nodes == save:
+                save += checkpoint.interval
+                # the search continues by visiting child, so the snapshot is taken just before this node
+                checkpoint.save({"graph": digest, "root": root, "nodes": nodes - 1, "child": child, "depth": depth,
+                                 "stack": stack, "path_visited": path_visited, "good_moves": good_moves, "table": table,
+                                 "proof": proof, "counters": (hypotheses, expansions, sumgames, max_depth), "visits": visits})
+            event = report if save is None else min(report, save)
+
+        if leaf[child]:
+            value = base[child]
+        elif child in path_visited: # apply inductive hypothesis
+            hypotheses += 1
+            if table is not None:
+                table.depend(child)
+            value = base[child]
+        else:
+            value = None
+            if donated is not None and child in donated: # the value may have been found by another search
+                value = monitor.collect(child, path_visited)
+            if value is None and table is not None:
+                value = table.lookup(child, path_visited)
+                if value is None:
+                    table.enter()
+            if value is None: # expand child
+                path_visited[child] = depth
+                expansions += 1
+                if depth > max_depth:
+                    max_depth = depth
+                if visits is not None:
+                    visits[child] += 1
+                frame = Frame(child, depth)
+                start_moves(frame, 'x', graph, good_moves)
+                stack.append(frame)
+                if proof is not None:
+                    proof.enter(graph.names[child])
+        if proof is not None and value is not None:
+            proof.leaf(graph.names[child], value)
+
+        # pass values up the stack until some frame needs another subgame evaluated
+        while stack:
+            frame = stack[-1]
+            if value is not None: # record the value of the subgame frame was waiting on
+                if frame.val1 is None and value != U:
+                    frame.val1 = value
+                else: # the sumgame is done (U + anything is U, so the second subgame is skipped)
+                    result = U if frame.val1 is None else SUM[frame.val1][value]
+                    sumgames += 1
+                    if proof is not None:
+                        proof.move(frame.player, graph.names[children[frame.player][2 * frame.moves[frame.index] + 1]] if frame.val1 is None else None)
+                    frame.val1 = None
+                    if frame.player == 'x':
+                        frame.x_features |= X_FEATURES[result]
+                        winning = frame.x_features & MUST_WIN
+                    else:
+                        frame.o_features |= O_FEATURES[result]
+                        winning = frame.o_features & MUST_WIN
+                    if winning: # a winning move ends the search of this player's moves
+                        good_moves.setdefault((frame.state, frame.player), set()).add(frame.moves[frame.index])
+                        frame.index = frame.end
+                    else:
+                        frame.index += 1
+                    if frame.index == frame.end and frame.player == 'x' and DECIDED[frame.x_features]:
+                        start_moves(frame, 'o', graph, good_moves)
+            elif frame.index == frame.end and frame.player == 'x': # no moves for x
+                start_moves(frame, 'o', graph, good_moves)
+
+            if frame.index < frame.end: # evaluate the next subgame
+                k = 2 * frame.moves[frame.index]
+                child = children[frame.player][k if frame.val1 is None else k + 1]
+                depth = frame.depth + 1
+                break
+
+            # if it is unknown whether x can win, the outcome is unknown whatever o can do
+            value = VALUE[frame.x_features][frame.o_features] if DECIDED[frame.x_features] else U
+            stack.pop()
+            path_visited.pop(frame.state)
+            if table is not None:
+                table.leave(frame.state, value)
+            if proof is not None:
+                proof.leave(value)
+        else:
+            if telemetry is not None:
+                telemetry.count(hypotheses, expansions, sumgames, max_depth)
+                telemetry.report(nodes, len(path_visited), done=True)
+            return NAMES[value], nodes
+
+def evaluate_iterative(state, game_dict, base_cases, good_moves, path_visited=None, table=None):
+    '''
+    Compile a game dictionary and compute the outcome class of state with search_graph.
+
+    :param state: starting position (e.g. "_")
+    :param game_dict: dictionary of all positions and their children after all possible x and o-moves
+    :param base_cases: dictionary of all values of small positions, and inductive hypotheses for patterns
+    :param good_moves: dictionary of winning moves found so far, keyed by (state, player)
+    :param path_visited: dictionary of states on the current path and their depths (optional)
+    :param table: optional TranspositionTable for reusing values of previously searched states
+    :returns value, nodes: outcome class of position and total number of nodes visited
+    '''
+    graph = compile_game_graph(game_dict, base_cases)
+    root = graph.intern(state, base_cases)
+    graph_path = {graph.intern(s, base_cases): d for s, d in (path_visited or {}).items()}
+    graph_good_moves = {}
+    for (s, player), moves in good_moves.items():
+        if s in game_dict:
+            first = graph.offsets[player][graph.ids[s]]
+            sumgames = game_dict[s].get(player, [])
+            graph_good_moves[(graph.ids[s], player)] = {first + k for k, move in enumerate(sumgames) if move in moves}
+    value, nodes = search_graph(graph, root, graph_good_moves, graph_path, table)
+    for (state_id, player), moves in graph_good_moves.items():
+        first = graph.offsets[player][state_id]
+        sumgames = list(game_dict[graph.names[state_id]].get(player, []))
+        good_moves.setdefault((graph.names[state_id], player), set()).update(sumgames[k - first] for k in moves)
+    return value, nodes
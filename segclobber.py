@@ -2,16 +2,59 @@ import subprocess
 from pathlib import Path
 from pprint import pp
 import os
+from solver import ClobberSolver
 
-def segclobber(position, player):
+# "binary" calls SEGClobber, "python" uses the in-process ClobberSolver, and "auto"
+# uses SEGClobber if its binary runs on this machine and ClobberSolver otherwise
+BACKENDS = ("auto", "binary", "python")
+backend = os.environ.get("CLOBBER_BACKEND", "auto")
+python_solver = ClobberSolver()
+binary_checked = {} # binary path -> True if it runs on this machine
+
+def set_backend(name):
     '''
-    Call SEGClobber binary.
+    Choose the solver used for small positions.
+    '''
+    global backend
+    if name not in BACKENDS:
+        raise ValueError(f"unknown solver backend {name!r}, expected one of {BACKENDS}")
+    backend = name
+
+def binary_path():
     '''
-    binary_path = os.environ.get(
+    Path of the SEGClobber binary.
+    '''
+    return Path(os.environ.get(
         "SEGCLOBBER_BINARY",
         str(Path(__file__).parent / "bin" / "segclobber")
-    )
-    binary = Path(binary_path)
+    ))
+
+def binary_available():
+    '''
+    Check whether the SEGClobber binary exists and runs on this machine.
+    '''
+    path = binary_path()
+    if path not in binary_checked:
+        try:
+            segclobber("BW", "B", timeout=10)
+            binary_checked[path] = True
+        except (OSError, subprocess.SubprocessError, IndexError):
+            binary_checked[path] = False
+    return binary_checked[path]
+
+def resolve_backend():
+    '''
+    Name of the backend that will actually be used ("binary" or "python").
+    '''
+    if backend == "auto":
+        return "binary" if binary_available() else "python"
+    return backend
+
+def segclobber(position, player, timeout=100):
+    '''
+    Call SEGClobber binary.
+    '''
+    binary = binary_path()
     cwd = binary.parent
 
     result = subprocess.run(
@@ -19,13 +62,29 @@ def segclobber(position, player):
         capture_output=True,
         text=True,
         check=True,
-        timeout=100,
+        timeout=timeout,
         cwd=cwd
     )
 
     winning_player = result.stdout[0]
     return winning_player
 
+def outcome_from_wins(left_can_win, right_can_win):
+    '''
+    Outcome class from whether Left wins moving first and whether Right wins moving
+    first, where None means the answer is unknown.
+    '''
+    if left_can_win is None or right_can_win is None:
+        return "U"
+    if left_can_win and right_can_win:
+        return "N"
+    if left_can_win and not right_can_win:
+        return "L"
+    if not left_can_win and right_can_win:
+        return "R"
+    if not left_can_win and not right_can_win:
+        return "P"
+
 def get_outcome_class(position):
     '''
     Compute the outcome class of a position by determining winning player if
@@ -33,27 +92,26 @@ def get_outcome_class(position):
     '''
     if position == "": # catch the empty game
         return "P"
+    if resolve_backend() == "python":
+        return outcome_from_wins(*python_solver.first_player_wins(position))
     position = position.replace("x", "B").replace("o", "W")
     left_can_win = True if segclobber(position, "B") == "B" else False
     right_can_win = True if segclobber(position, "W") == "W" else False
+    return outcome_from_wins(left_can_win, right_can_win)
 
-    if left_can_win and right_can_win:
-        return "N"
-    if left_can_win and not right_can_win:
-        return "L"
-    if not left_can_win and right_can_win:
-        return "R"
-    if not left_can_win and not right_can_win:
-        return "P"
+def base_case_games(pattern, q, length):
+    '''
+    Small games with up to {length} copies of q for a pattern.
+    '''
+    prefix, suffix = pattern.split("_")
+    return [f"{prefix}{q*i}{suffix}" for i in range(length)]
 
 def compute_base_cases(pattern, q, length):
     '''
     Compute outcome class of small games with up to {length} copies of q.
     '''
-    prefix, suffix = pattern.split("_")
     result = {}
-    for i in range(length):
-        g = f"{prefix}{q*i}{suffix}"
+    for g in base_case_games(pattern, q, length):
         result[g] = get_outcome_class(g)
     return result
 
@@ -72,16 +130,87 @@ def evaluate_base_cases(pattern, base_cases):
         base_cases.pop(g)
     return result
 
-def compute_all_base_cases(patterns, small_games, q, amount):
+def stable_tail(outcomes, period=1):
+    '''
+    Index where the longest tail of outcomes repeating with the given period starts.
+    '''
+    start = max(len(outcomes) - period, 0)
+    while start > 0 and outcomes[start - 1] == outcomes[start - 1 + period]:
+        start -= 1
+    return start
+
+def required_length(start, window, period=1):
+    '''
+    Number of outcomes needed before a tail starting at {start} is convincing:
+    it must repeat for {window} periods, and be at least as long as what comes before it.
+    '''
+    return start + max(window * period, start)
+
+def find_period(outcomes, window, max_period=4):
+    '''
+    Smallest period with which the outcomes convincingly repeat, or None.
+    '''
+    for period in range(1, max_period + 1):
+        if len(outcomes) >= required_length(stable_tail(outcomes, period), window, period):
+            return period
+    return None
+
+def adaptive_horizons(patterns, q, window, max_amount, scheduler):
+    '''
+    Number of copies of q to solve for each pattern. Starting from {window} copies,
+    the positions of all unsettled patterns are solved together, and each pattern grows to
+    the length its current stable tail would need, until its outcomes repeat convincingly
+    (see find_period) or it reaches {max_amount} copies.
+
+    :param patterns: patterns with a single "_" (e.g. ["x_o", "_"])
+    :param window: number of periods a stable tail must last
+    :param max_amount: largest number of copies of q solved for a pattern
+    :param scheduler: SolverScheduler used to solve each round of positions
+    :returns lengths: dictionary mapping each pattern to its number of copies of q
+    '''
+    lengths = {pattern: min(window, max_amount) for pattern in patterns}
+    growing = set(patterns)
+    while growing:
+        scheduler.solve(g for pattern in growing for g in base_case_games(pattern, q, lengths[pattern]) if g not in scheduler.solved)
+        for pattern in sorted(growing):
+            games = base_case_games(pattern, q, lengths[pattern])
+            outcomes = [scheduler.solved[g] for g in games]
+            needed = min(required_length(stable_tail(outcomes), window), max_amount)
+            if find_period(outcomes, window) is not None or needed <= lengths[pattern]:
+                growing.discard(pattern)
+            else:
+                lengths[pattern] = needed
+    return lengths
+
+def compute_all_base_cases(patterns, small_games, q, amount, scheduler, window=0, horizons=None):
     '''
     Compute all base case outcome classes for a patterns resulting 
     from playing in a given game.
+
+    :param scheduler: SolverScheduler used to solve all positions concurrently
+    :param window: if positive, solve each pattern only until its outcomes are stable for {window} copies of q, up to {amount} copies (optional)
+    :param horizons: dictionary filled with (number of copies of q solved, period of the outcomes or None) for each pattern (optional)
     '''
+    if window:
+        lengths = adaptive_horizons(patterns, q, window, amount, scheduler)
+    else:
+        lengths = {pattern: amount for pattern in patterns}
+    # solve every position up front, so duplicates are solved once and calls run concurrently,
+    # and read the outcomes from scheduler.solved so that no position is requested twice
+    small_games = list(small_games)
+    all_games = list(small_games)
+    for pattern in patterns:
+        all_games.extend(base_case_games(pattern, q, lengths[pattern]))
+    scheduler.solve(g for g in all_games if g not in scheduler.solved)
+
     result = {}
     small = {}
     for pattern in patterns:
         small[pattern] = []
-        base_cases = compute_base_cases(pattern, q, amount)
+        base_cases = {g: scheduler.solved[g] for g in base_case_games(pattern, q, lengths[pattern])}
+        if horizons is not None:
+            outcomes = [base_cases[g] for g in base_case_games(pattern, q, lengths[pattern])]
+            horizons[pattern] = (lengths[pattern], find_period(outcomes, window or 1))
         simplified_base_cases = evaluate_base_cases(pattern, base_cases)
         inductive_hypothesis = simplified_base_cases[pattern]
         for game, outcome in simplified_base_cases.items():
@@ -90,8 +219,7 @@ def compute_all_base_cases(patterns, small_games, q, amount):
             if outcome != inductive_hypothesis:
                 result[game] = outcome
                 small[pattern].append(game)
-    for small_game in small_games:
-        result[small_game] = get_outcome_class(small_game)
+    result.update({g: scheduler.solved[g] for g in small_games})
     return result, small
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+from collections import Counter
+
+SWAP_COLORS = str.maketrans("xo", "ox")
+
+def orient(component):
+    '''
+    Canonical orientation of a component: a component and its reversal are the same game.
+    '''
+    return min(component, component[::-1])
+
+def conjugate(component):
+    '''
+    The negative of a component (x and o swapped), in canonical orientation.
+    '''
+    return orient(component.translate(SWAP_COLORS))
+
+def normalize(components):
+    '''
+    Canonical form of a sum of components. Components without moves for either player
+    are removed, each remaining component is oriented, and pairs G + (-G) are cancelled,
+    since they add up to zero and do not change the outcome.
+
+    :param components: iterable of xo-strings
+    :returns: sorted tuple of components
+    '''
+    counts = Counter(orient(c) for c in components if "x" in c and "o" in c)
+    for component in list(counts):
+        negative = conjugate(component)
+        if negative == component:
+            counts[component] %= 2
+        elif negative in counts and component < negative:
+            pairs = min(counts[component], counts[negative])
+            counts[component] -= pairs
+            counts[negative] -= pairs
+    return tuple(sorted(counts.elements()))
+
+def moves(component, player):
+    '''
+    All pairs of components resulting from a move by player in component.
+    '''
+    result = []
+    for i, piece in enumerate(component):
+        if piece != player:
+            continue
+        if i > 0 and component[i-1] != player: # capture to the left
+            result.append((component[:i-1] + player, component[i+1:]))
+        if i + 1 < len(component) and component[i+1] != player: # capture to the right
+            result.append((component[:i], player + component[i+2:]))
+    return result
+
+class ClobberSolver:
+    '''
+    In-process solver for linear Clobber. A position is split into independent components
+    (separated by "."), and each sum of components is searched once per player to move,
+    with results stored in a transposition table keyed by its canonical form.
+    '''
+    def __init__(self):
+        self.table = {} # (canonical components, player to move) -> True if that player wins
+        self.searches = 0 # positions solved
+
+    def wins(self, components, player):
+        '''
+        Return True if player, moving first in the sum of (normalized) components, wins.
+        '''
+        key = (components, player)
+        if key in self.table:
+            return self.table[key]
+        other = "o" if player == "x" else "x"
+        result = False
+        for i, component in enumerate(components):
+            if i > 0 and component == components[i-1]: # same moves as the previous component
+                continue
+            rest = components[:i] + components[i+1:]
+            for left, right in moves(component, player):
+                if not self.wins(normalize(rest + (left, right)), other):
+                    result = True
+                    break
+            if result:
+                break
+        self.table[key] = result
+        return result
+
+    def first_player_wins(self, position):
+        '''
+        Return (Left wins moving first, Right wins moving first) for an xo-string.
+        Both searches share the transposition table.
+        '''
+        self.searches += 1
+        components = normalize(position.split("."))
+        return self.wins(components, "x"), self.wins(components, "o")
@@ -0,0 +1,102 @@
+import heapq
+import json
+import time
+
+class Telemetry:
+    '''
+    Live statistics of a long search, written as one JSON line every interval nodes.
+    The searches only bump a few counters on the hot path (inductive hypotheses,
+    expanded states and their depths, sumgames searched, and a visit count per
+    expanded state); everything else is computed when a record is written.
+
+    Each record has the elapsed time, nodes visited, nodes per second since the
+    previous record, the current and maximum depth, inductive hypothesis hits, the
+    effective branching factor (sumgames searched per expanded state), the stats()
+    of each cache in caches, and the most visited states with their visit counts
+    and numbers of x and o-moves. The last record, written when the search ends,
+    has "done" set.
+    '''
+    def __init__(self, path, interval=1000000, caches=None, top=10):
+        '''
+        :param path: file the JSON lines are appended to
+        :param interval: number of nodes between records
+        :param caches: dictionary of named objects with a stats() method, e.g. a TranspositionTable (optional)
+        :param top: number of most visited states reported in each record
+        '''
+        self.path = path
+        self.interval = interval
+        self.caches = caches or {}
+        self.top = top
+        self.file = open(path, "a", encoding="utf-8")
+        self.hypotheses = 0 # inductive hypothesis hits
+        self.expansions = 0 # states expanded
+        self.sumgames = 0 # sumgames searched
+        self.max_depth = 0
+        self.visits = {} # state -> number of times it was expanded (search_graph uses a list indexed by state ID)
+        self.describe = lambda state: (state, 0, 0) # state -> (name, number of x-moves, number of o-moves), set by the search
+        self.start = time.perf_counter()
+        self.last = (self.start, 0) # time and node count of the previous record
+        self.records = 0
+
+    def expand(self, state, depth):
+        '''
+        Count an expanded state (used by the recursive search; search_graph keeps its own counters).
+        '''
+        self.expansions += 1
+        self.visits[state] = self.visits.get(state, 0) + 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def count(self, hypotheses, expansions, sumgames, max_depth):
+        '''
+        Set the counters kept by search_graph in local variables.
+        '''
+        self.hypotheses = hypotheses
+        self.expansions = expansions
+        self.sumgames = sumgames
+        self.max_depth = max_depth
+
+    def report(self, nodes, depth, done=False):
+        '''
+        Write a record for the search so far.
+
+        :param nodes: nodes visited
+        :param depth: current search depth
+        :param done: True for the final record of a search
+        '''
+        now = time.perf_counter()
+        last_time, last_nodes = self.last
+        self.last = (now, nodes)
+        states = []
+        counts = self.visits.items() if isinstance(self.visits, dict) else enumerate(self.visits)
+        for state, visits in heapq.nlargest(self.top, counts, key=lambda item: item[1]):
+            if not visits:
+                break
+            name, x_moves, o_moves = self.describe(state)
+            states.append({"state": name, "visits": visits, "x": x_moves, "o": o_moves})
+        record = {
+            "time": round(now - self.start, 3),
+            "nodes": nodes,
+            "nodes_per_sec": round((nodes - last_nodes) / (now - last_time)) if now > last_time else 0,
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "hypotheses": self.hypotheses,
+            "expansions": self.expansions,
+            "branching": round(self.sumgames / self.expansions, 3) if self.expansions else 0.0,
+            "caches": {name: cache.stats() for name, cache in self.caches.items()},
+            "states": states,
+            "done": done
+        }
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        self.records += 1
+
+    def close(self):
+        self.file.close()
+
+def read_telemetry(path):
+    '''
+    Return the list of records in a telemetry file.
+    '''
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
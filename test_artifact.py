@@ -0,0 +1,56 @@
+import os
+import stat
+import segclobber
+import generator
+from artifact import ArtifactCache, artifact_key
+from graph import compile_game_graph
+
+def test_artifact_key():
+    key = artifact_key("xoo_ox", "x", {("x", "o", "o"), ("o",)}, {("o", "x")}, False, 14)
+    assert key == artifact_key("xoo_ox", "x", {("o",), ("x", "o", "o")}, {("o", "x")}, False, 14)
+    assert key != artifact_key("xoo_ox", "x", {("x", "o", "o"), ("o",)}, {("o", "x")}, True, 14)
+    assert key != artifact_key("xoo_ox", "x", {("x", "o", "o"), ("o",)}, {("o", "x")}, False, 14, window=3)
+
+def test_store_and_load(random_games, tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    assert cache.load("missing") is None
+    for i, (game_dict, base_cases) in enumerate(random_games):
+        base_cases = dict(base_cases, **{"": "P", "xxxo": "L"}) # base cases of states outside the graph
+        graph = compile_game_graph(game_dict, base_cases)
+        cache.store(str(i), graph, base_cases)
+        loaded, loaded_base_cases = cache.load(str(i))
+        assert loaded.to_game_dict() == graph.to_game_dict()
+        assert loaded.base == graph.base
+        assert loaded_base_cases == base_cases
+
+def test_run_reuses_artifact(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(segclobber, "backend", "python")
+    def run(**kwargs):
+        return generator.run("xoo_ox", "x", {tuple("xoo")}, {tuple("ox")}, artifact_cache=str(tmp_path / "artifacts"), **kwargs)
+    assert run() == ("N", 95)
+    # a rerun must not build the game graph or solve any positions
+    monkeypatch.setattr(generator, "build_game_graph", None)
+    assert run(engine="iterative") == ("N", 95)
+
+def test_artifact_saves_game_dict(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(segclobber, "backend", "python")
+    cache = str(tmp_path / "artifacts")
+    value = generator.run("xoo_ox", "x", {tuple("xoo")}, {tuple("ox")}, artifact_cache=cache)
+    # loaded from the artifact cache, the run still saves the game dictionary for moves=True
+    assert generator.run("xoo_ox", "x", {tuple("xoo")}, {tuple("ox")}, "saved", artifact_cache=cache) == value
+    assert (tmp_path / "json" / "saved" / "saved_game_dict.json").exists()
+    assert generator.run("xoo_ox", "x", set(), set(), "saved", moves=True) == value
+
+def test_failed_solver_calls_not_stored(tmp_path, monkeypatch):
+    # a solver that always fails, so every position gets the outcome U
+    binary = tmp_path / "segclobber"
+    binary.write_text("#!/bin/sh\nexit 1\n")
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("SEGCLOBBER_BINARY", str(binary))
+    monkeypatch.setattr(segclobber, "backend", "binary")
+    cache = tmp_path / "artifacts"
+    game_dict, base_cases, graph = generator.load_game_graph("o_", "x", {tuple("o")}, {()}, horizon=2, artifact_cache=str(cache))
+    assert "U" in base_cases.values()
+    assert os.listdir(cache) == []
@@ -0,0 +1,64 @@
+import json
+import contextlib
+import io
+import pytest
+import segclobber
+import batch
+from generator import load_game_graph
+from prover import evaluate
+from scc import evaluate_scc
+from dfpn import evaluate_dfpn
+
+SPECS = [
+    {"state": "o_", "q": "x", "prefixes": ["o"]},
+    {"state": "xo_ox", "q": "x"},
+    {"state": "xoo_ox", "q": "x"},
+    {"state": "oox_", "q": "o"},
+    {"state": "_", "q": "xxo", "conj": True, "horizon": 3}
+]
+
+@pytest.fixture
+def specs(tmp_path):
+    path = tmp_path / "specs.jsonl"
+    path.write_text("\n".join(json.dumps(spec) for spec in SPECS) + "\n")
+    return batch.read_specs(str(path), horizon=6)
+
+def test_read_specs(specs):
+    assert specs[1] == {"state": "xo_ox", "q": "x", "prefixes": ["xo"], "suffixes": ["ox"], "conj": False, "horizon": 6, "window": 0}
+    assert specs[4]["conj"] and specs[4]["horizon"] == 3
+
+def test_group_families(specs):
+    # xo_ox and o_ fit in the closure of xoo_ox
+    assert batch.group_families(specs) == [[4], [2, 1, 0], [3]]
+
+@pytest.mark.parametrize("engine", ["recursive", "iterative", "scc", "dfpn"])
+def test_matches_separate_runs(specs, tmp_path, monkeypatch, engine):
+    monkeypatch.setattr(segclobber, "backend", "python")
+    output = tmp_path / "results.jsonl"
+    records = batch.run_batch(specs, str(output), jobs=2, engine=engine, outcome_cache=str(tmp_path / "outcomes.sqlite"))
+    assert [json.loads(line) for line in output.read_text().splitlines()] == records
+    assert sorted(record["state"] for record in records) == sorted(spec["state"] for spec in specs)
+    for record in records:
+        spec = {key: record[key] for key in specs[0]}
+        with contextlib.redirect_stdout(io.StringIO()):
+            game_dict, base_cases, graph = load_game_graph(spec["state"], spec["q"], batch.patterns(spec["prefixes"]), batch.patterns(spec["suffixes"]),
+                                                           conj=spec["conj"], horizon=spec["horizon"])
+        if engine == "scc":
+            assert (record["outcome"], record["nodes"]) == evaluate_scc(spec["state"], game_dict, base_cases)
+        elif engine == "dfpn":
+            assert (record["outcome"], record["nodes"]) == evaluate_dfpn(spec["state"], game_dict, base_cases)
+        else:
+            assert (record["outcome"], record["nodes"]) == evaluate(spec["state"], game_dict, base_cases, 0, 0, {})
+    graphs = {record["state"]: record["graph"] for record in records}
+    assert graphs["xo_ox"] == "xoo_ox"
+    # o_ is merged into its reversal _o in the graph of xoo_ox, so it is searched on its own
+    assert graphs["o_"] == "o_"
+
+def test_build_uses_closure(specs, monkeypatch):
+    monkeypatch.setattr(segclobber, "backend", "python")
+    closure = batch.closure(specs[2])
+    monkeypatch.setattr(batch.generator, "generate_patterns", None)
+    game_dict, base_cases, graph = batch.build(specs[2], closure, "recursive", None, None)
+    assert graph is None and "xoo_ox" in game_dict
+    game_dict, base_cases, graph = batch.build(specs[2], closure, "iterative", None, None)
+    assert game_dict is None and "xoo_ox" in graph.ids
@@ -0,0 +1,24 @@
+import segclobber
+from benchmarks.pipeline import benchmark, compare
+
+def test_pipeline(monkeypatch):
+    monkeypatch.setattr(segclobber, "backend", "python")
+    results = benchmark(["xoo(x)^n ox"], repeat=1)
+    result = results["xoo(x)^n ox"]
+    assert result["outcome"] == "N"
+    assert list(result["phases"]) == ["closure", "game_dict", "base_cases", "compile", "search", "proof"]
+    assert result["phases"]["search"]["nodes"] == 95
+    assert result["phases"]["base_cases"]["solver_calls"] > 0
+    assert all(row["peak"] > 0 for row in result["phases"].values())
+    assert compare(results, results, 0.1, 0.5, 0.05) == []
+
+def test_compare():
+    baseline = {"a": {"outcome": "L", "phases": {"search": {"time": 1.0, "nodes": 100, "solver_calls": 0, "peak": 1000}}}}
+    results = {"a": {"outcome": "N", "phases": {"search": {"time": 1.4, "nodes": 120, "solver_calls": 2, "peak": 1050}}},
+               "b": {"outcome": "L", "phases": {}}}
+    assert compare(results, baseline, 0.1, 0.5, 0.05) == [
+        "a: outcome L -> N",
+        "a: search nodes 100 -> 120 (+20%)",
+        "a: search solver_calls 0 -> 2"
+    ]
+    assert "a: search time 1 -> 1.4 (+40%)" in compare(results, baseline, 0.1, 0.2, 0.05)
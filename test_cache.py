@@ -0,0 +1,12 @@
+import pytest
+from cache import canonicalize
+
+@pytest.mark.parametrize("position, expected", [
+    ("xxo", ("oox", True)),
+    ("oxx", ("oox", True)),
+    ("oox", ("oox", False)),
+    ("xoo", ("oox", False)),
+    ("", ("", False))
+])
+def test_canonicalize(position, expected):
+    assert canonicalize(position) == expected
@@ -0,0 +1,59 @@
+import pytest
+from checkpoint import Checkpoint
+from graph import compile_game_graph
+from prover import ProofRecorder
+from search import search_graph
+from transposition import TranspositionTable
+
+class Crash(Exception):
+    pass
+
+class CrashingCheckpoint(Checkpoint):
+    '''
+    Checkpoint that stops the search right after its given number of snapshots.
+    '''
+    def __init__(self, path, interval, crash_after):
+        super().__init__(path, interval)
+        self.crash_after = crash_after
+
+    def save(self, snapshot):
+        super().save(snapshot)
+        if self.saves == self.crash_after:
+            raise Crash()
+
+@pytest.mark.parametrize("interval, crash_after", [(1, 1), (3, 2), (7, 5)])
+def test_resume_matches(random_games, tmp_path, interval, crash_after):
+    for i, (game_dict, base_cases) in enumerate(random_games):
+        graph = compile_game_graph(game_dict, base_cases)
+        root = graph.ids["_"]
+        good_moves = {}
+        table, proof = TranspositionTable(50), ProofRecorder()
+        expected = search_graph(graph, root, good_moves, table=table, proof=proof)
+        path = str(tmp_path / f"{i}.checkpoint")
+        try:
+            search_graph(graph, root, {}, table=TranspositionTable(50), proof=ProofRecorder(), checkpoint=CrashingCheckpoint(path, interval, crash_after))
+        except Crash:
+            pass
+        else: # finished before the crash
+            assert expected[1] < interval * crash_after
+            continue
+        resumed_good_moves = {}
+        resumed_table, resumed_proof = TranspositionTable(50), ProofRecorder()
+        snapshot = Checkpoint(path).load()
+        assert snapshot["nodes"] == interval * crash_after - 1
+        assert search_graph(graph, root, resumed_good_moves, table=resumed_table, proof=resumed_proof, resume=snapshot) == expected
+        assert resumed_good_moves == good_moves
+        assert resumed_table.stats() == table.stats()
+        assert resumed_proof.root.to_json(0) == proof.root.to_json(0)
+
+def test_wrong_graph(random_games, tmp_path):
+    (game_dict, base_cases), (other_dict, other_base_cases) = random_games[:2]
+    graph = compile_game_graph(game_dict, base_cases)
+    checkpoint = Checkpoint(str(tmp_path / "search.checkpoint"), 1)
+    search_graph(graph, graph.ids["_"], {}, checkpoint=checkpoint)
+    other = compile_game_graph(other_dict, other_base_cases)
+    with pytest.raises(ValueError):
+        search_graph(other, other.ids["_"], {}, resume=checkpoint.load())
+
+def test_missing(tmp_path):
+    assert Checkpoint(str(tmp_path / "none.checkpoint")).load() is None
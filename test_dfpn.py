@@ -0,0 +1,35 @@
+import pytest
+from prover import evaluate
+from dfpn import evaluate_dfpn, ProofNumberSearch
+
+def test_matches_recursive(random_games):
+    for game_dict, base_cases in random_games:
+        assert evaluate_dfpn("_", game_dict, base_cases)[0] == evaluate("_", game_dict, base_cases, 0, 0, {})[0]
+
+def test_matches_recursive_on_path(random_games):
+    # states already on the path get their inductive hypotheses
+    for game_dict, base_cases in random_games:
+        path_visited = {"x_": 0, "xxx_": 1}
+        assert evaluate_dfpn("_", game_dict, base_cases, dict(path_visited))[0] == evaluate("_", game_dict, base_cases, 0, 0, {}, dict(path_visited))[0]
+
+@pytest.mark.parametrize("value", ["L", "R", "N", "P", "U"])
+def test_small_position(value):
+    assert evaluate_dfpn("xo", {}, {"xo": value})[0] == value
+
+def test_reuses_atoms():
+    # "x_" is L, so x wins by moving to "x_" + ""
+    game_dict = {
+        "_": {"x": (("x_", ""), ("x_", "o")), "o": ()},
+        "x_": {"x": (("", ""),), "o": ()}
+    }
+    base_cases = {"": "P", "o": "R", "_": "N", "x_": "P"}
+    search = ProofNumberSearch(game_dict, base_cases)
+    assert search.prove("_", "LT", frozenset())
+    nodes = search.nodes
+    # the answer does not depend on the path, so it is reused without search
+    assert search.prove("_", "LT", frozenset({"xx_"}))
+    assert (search.nodes, search.reused) == (nodes + 1, 1)
+    # on a path through "_" itself, the inductive hypothesis N is used instead
+    assert search.prove("_", "LT", frozenset({"_"}))
+    assert not search.prove("_", "RT", frozenset({"x_"}))
+    assert evaluate_dfpn("_", game_dict, base_cases)[0] == evaluate("_", game_dict, base_cases, 0, 0, {})[0] == "L"
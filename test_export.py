@@ -0,0 +1,49 @@
+import pytest
+from prover import proof_tree
+from export import export_proof, read_proof
+
+def expand(node_id, nodes):
+    '''
+    Rebuild the nested form of Node.to_json from a proof DAG.
+    '''
+    record = nodes[node_id]
+    children = {}
+    for player, pairs in record.get("children", {}).items():
+        for a, b in pairs:
+            children[f"{player}: {nodes[a]['label']} + {nodes[b]['label']}"] = [expand(a, nodes), expand(b, nodes)]
+    return {"label": record["label"], "value": record["value"], "children": children}
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".jsonl.gz"])
+def test_export_matches_proof_tree(random_games, tmp_path, suffix):
+    path = str(tmp_path / f"proof{suffix}")
+    for game_dict, base_cases in random_games:
+        stats = export_proof(path, "_", game_dict, base_cases)
+        root, nodes = read_proof(path)
+        assert root == stats["root"]
+        assert len(nodes) == stats["nodes"]
+        assert all(a < node_id and b < node_id for node_id, record in nodes.items() for pairs in record.get("children", {}).values() for a, b in pairs)
+        assert expand(root, nodes) == proof_tree("_", game_dict, base_cases).to_json(0)
+
+def test_shared_subtrees(tmp_path):
+    # every level has two moves to the same state, so the tree doubles at each level but the DAG does not
+    depth = 30
+    game_dict = {f"{'x' * i}_": {"x": ((f"{'x' * (i + 1)}_", "o"), (f"{'x' * (i + 1)}_", "oo")), "o": ()} for i in range(depth)}
+    game_dict[f"{'x' * depth}_"] = {"x": (), "o": ()}
+    base_cases = {"o": "R", "oo": "R"}
+    base_cases.update({state: "P" for state in game_dict})
+    stats = export_proof(str(tmp_path / "proof.jsonl"), "_", game_dict, base_cases)
+    assert stats["nodes"] == depth + 1 + 2
+    root, nodes = read_proof(str(tmp_path / "proof.jsonl"))
+    assert nodes[root]["label"] == "_"
+
+def test_deep_chain(tmp_path):
+    # deeper than the recursion limit
+    depth = 2000
+    game_dict = {f"{'x' * i}_": {"x": ((f"{'x' * (i + 1)}_", ""),), "o": ()} for i in range(depth)}
+    game_dict[f"{'x' * depth}_"] = {"x": (("_", ""),), "o": ()}
+    base_cases = {state: "L" for state in game_dict}
+    base_cases[""] = "P"
+    stats = export_proof(str(tmp_path / "proof.jsonl.gz"), "_", game_dict, base_cases)
+    root, nodes = read_proof(str(tmp_path / "proof.jsonl.gz"))
+    assert nodes[root]["value"] == "L"
+    assert stats["nodes"] == depth + 3
@@ -1,5 +1,7 @@
 import pytest
 import generator
+import segclobber
+from prover import evaluate
 
 def normalize(obj):
     """
@@ -99,16 +101,32 @@ def test_generate_patterns(prefixes, suffixes, q, p, s):
     small = generator.generate_small_patterns(pfxs, sfxs, q)
     assert generator.generate_patterns(prefixes, suffixes, q) == (p, s, small)
 
-@pytest.mark.parametrize("prefixes, suffixes, q, expected", [
-    ({"o"}, {""}, "xxo", [["o_", "o_"]])
-    #({"x", "oo"}, {"o", "xxx"}, "xxo", [["oo_o", "oo_o"], ["oo_xxx", "x_o"], ["x_xxx", "x_xxx"], ["x_o", "oo_xxx"]])
+@pytest.mark.parametrize("prefixes, suffixes, q, keep, expected", [
+    ({"o"}, {""}, "xxo", (), {"o_": "o_"}),
+    # the reversal of oo(xxo)^n xxx is x(oxx)^(n+1)o = x(xxo)^(n+1)o, so oo_xxx is merged into x_o
+    ({"x", "oo"}, {"o", "xxx"}, "xxo", (), {"x_o": "x_o", "oo_xxx": "x_o", "x_xxx": "x_xxx", "oo_o": "oo_o"}),
+    ({"xo", ""}, {"ox", ""}, "x", (), {"_": "_", "_ox": "_ox", "xo_": "_ox", "xo_ox": "xo_ox"}),
+    ({"xo", ""}, {"ox", ""}, "x", {"xo_"}, {"_": "_", "_ox": "xo_", "xo_": "xo_", "xo_ox": "xo_ox"}),
+    # copies of q moved into the "_"
+    ({"x", "xx", ""}, {"", "x"}, "x", (), {"_": "_", "_x": "_", "x_": "_", "x_x": "_", "xx_": "_", "xx_x": "_"}),
+    ({"x", ""}, {""}, "x", {"x_"}, {"_": "_", "x_": "x_"}),
+    # the reversal of o(xxo)^n x is x(oxx)^n o = xo(xxo)^n
+    ({"o", "xo"}, {"x", ""}, "xxo", (), {"o_": "o_", "o_x": "o_x", "xo_": "o_x", "xo_x": "xo_x"})
 ])
-def test_find_symmetries_xxo(prefixes, suffixes, q, expected):
+def test_find_symmetries(prefixes, suffixes, q, keep, expected):
     q = tuple(q)
     prefixes = {tuple(p) for p in prefixes}
     suffixes = {tuple(s) for s in suffixes}
-    expected = [[split_p_s(item) for item in group] for group in expected]
-    assert generator.find_symmetries_xxo(prefixes, suffixes, q) == expected
+    assert generator.find_symmetries(prefixes, suffixes, q, keep)[0] == expected
+
+@pytest.mark.parametrize("prefix, suffix, q, expected", [
+    ("o", "", "xo", 2), # o(xo)^n is the negative of (xo)^n x
+    ("o", "", "xxo", 0) # the negative of xxo is not a rotation of it
+])
+def test_find_symmetries_conjugates(prefix, suffix, q, expected):
+    prefixes = {tuple(prefix), ()}
+    suffixes = {tuple(suffix), tuple("x")}
+    assert generator.find_symmetries(prefixes, suffixes, tuple(q))[1] == expected
 
 @pytest.mark.parametrize("state, pattern, prefixes, suffixes, expected", [
     ("xo_ox", "x", {"xo"}, {"ox"}, "P"),
@@ -120,4 +138,71 @@ def test_run(state, pattern, prefixes, suffixes, expected):
     prefixes = {tuple(p) for p in prefixes}
     suffixes = {tuple(s) for s in suffixes}
     assert generator.run(state, pattern, prefixes, suffixes, None)[0] == expected 
-  
\ No newline at end of file
+  
+def naive_closure(prefixes, suffixes, q):
+    while True:
+        p = generator.get_prefixes(prefixes, q)
+        s = generator.get_suffixes(suffixes, q)
+        if p == prefixes and s == suffixes:
+            return prefixes, suffixes
+        prefixes, suffixes = prefixes | p, suffixes | s
+
+@pytest.mark.parametrize("prefixes, suffixes, q", [
+    ({"o"}, {"o"}, "x"),
+    ({"xxo"}, {"ox"}, "x"),
+    ({"oox"}, set(), "o"),
+    ({"x", "oo"}, {"o", "xxx"}, "xxo"),
+    ({"oxxo", "xo"}, {"xoox"}, "xxoxo"),
+    (set(), set(), "xoxxoo")
+])
+def test_generate_patterns_matches_fixpoint(prefixes, suffixes, q):
+    q = tuple(q)
+    prefixes = {tuple(p) for p in prefixes}
+    suffixes = {tuple(s) for s in suffixes}
+    p, s = naive_closure(set(prefixes), set(suffixes), q)
+    assert generator.generate_patterns(prefixes, suffixes, q)[:2] == (p, s)
+    assert (prefixes, suffixes) == (p, s)
+
+def test_tail_trie():
+    trie = generator.TailTrie()
+    assert trie.new_tails(tuple("xxo")) == [2, 1, 0]
+    assert trie.new_tails(tuple("oxo")) == [0]
+    assert trie.new_tails(tuple("xo")) == []
+    assert trie.nodes == 4
+
+def test_run_loads_moves(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    value = generator.run("xoo_ox", "x", {tuple("xoo")}, {tuple("ox")}, "saved")
+    assert (tmp_path / "json" / "saved" / "saved_game_dict.json").exists()
+    assert generator.run("xoo_ox", "x", set(), set(), "saved", moves=True) == value
+
+def test_run_compiles_only_for_graph_engines(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(segclobber, "backend", "python")
+    value = generator.run("xoo_ox", "x", {tuple("xoo")}, {tuple("ox")}, engine="iterative")
+    monkeypatch.setattr(generator, "compile_game_graph", None)
+    for engine in ("recursive", "scc", "dfpn"):
+        assert generator.run("xoo_ox", "x", {tuple("xoo")}, {tuple("ox")}, engine=engine)[0] == value[0]
+
+@pytest.mark.parametrize("state, pattern, prefixes, suffixes, conj", [
+    ("xoo_ox", "x", {"xoo"}, {"ox"}, False),
+    ("_", "xxo", set(), set(), True)
+])
+def test_lazy_game_dict(state, pattern, prefixes, suffixes, conj, monkeypatch):
+    monkeypatch.setattr(segclobber, "backend", "python")
+    p = {tuple(prefix) for prefix in prefixes} or {()}
+    s = {tuple(suffix) for suffix in suffixes} or {()}
+    game_dict, base_cases, graph = generator.build_game_graph(pattern, set(p), set(s), conj=conj, horizon=4)
+    lazy, lazy_base_cases, none = generator.build_game_graph(pattern, set(p), set(s), conj=conj, horizon=4, lazy=True)
+    assert none is None and lazy_base_cases == base_cases
+    assert evaluate(state, lazy, base_cases, 0, 0, {}) == evaluate(state, game_dict, base_cases, 0, 0, {})
+    assert 0 < lazy.materialized <= len(lazy)
+    assert dict(lazy) == game_dict
+    assert lazy.materialized == len(lazy)
+
+def test_run_lazy(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(segclobber, "backend", "python")
+    assert generator.run("xoo_ox", "x", {tuple("xoo")}, {tuple("ox")}, lazy=True) == generator.run("xoo_ox", "x", {tuple("xoo")}, {tuple("ox")})
+    with pytest.raises(ValueError):
+        generator.run("xoo_ox", "x", {tuple("xoo")}, {tuple("ox")}, engine="iterative", lazy=True)
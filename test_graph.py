@@ -0,0 +1,37 @@
+from graph import compile_game_graph, GameGraph, strongly_connected_components
+from outcomes import CLASSES
+from search import search_graph
+from prover import evaluate
+
+def test_compile_round_trip(random_games):
+    for game_dict, base_cases in random_games:
+        graph = compile_game_graph(game_dict, base_cases)
+        for state, moves in game_dict.items():
+            state_id = graph.ids[state]
+            assert not graph.leaf[state_id]
+            for player in ["x", "o"]:
+                pairs = [(graph.names[a], graph.names[b]) for a, b in graph.moves(state_id, player)]
+                assert pairs == list(moves[player])
+        for state_id, state in enumerate(graph.names):
+            assert graph.leaf[state_id] == ("_" not in state)
+            assert graph.base[state_id] == CLASSES.get(base_cases.get(state), 0)
+
+def test_search_graph(random_games):
+    for game_dict, base_cases in random_games:
+        graph = compile_game_graph(game_dict, base_cases)
+        assert search_graph(graph, graph.ids["_"], {}) == evaluate("_", game_dict, base_cases, 0, 0, {})
+
+def test_bytes_round_trip(random_games):
+    for game_dict, base_cases in random_games:
+        graph = compile_game_graph(game_dict, base_cases)
+        copy = GameGraph.from_bytes(graph.to_bytes())
+        assert (copy.names, copy.ids, copy.leaf, copy.base) == (graph.names, graph.ids, graph.leaf, graph.base)
+        assert (copy.offsets, copy.children) == (graph.offsets, graph.children)
+        assert copy.to_game_dict() == {state: {player: tuple(moves[player]) for player in ["x", "o"]} for state, moves in game_dict.items()}
+
+def test_strongly_connected_components():
+    edges = {"a": ["b"], "b": ["c", "d"], "c": ["a"], "d": ["e"], "e": ["d", "f"], "f": [], "g": ["g", "a"]}
+    components = strongly_connected_components(edges, lambda state: edges[state])
+    assert sorted(sorted(c) for c in components) == [["a", "b", "c"], ["d", "e"], ["f"], ["g"]]
+    order = {state: i for i, c in enumerate(components) for state in c}
+    assert all(order[child] <= order[state] for state in edges for child in edges[state])
@@ -0,0 +1,41 @@
+import pytest
+from itertools import combinations
+from ordering import ORDERINGS, MoveOrdering
+from prover import evaluate, ProofRecorder
+
+POLICIES = [c for k in range(len(ORDERINGS) + 1) for c in combinations(ORDERINGS, k)]
+
+@pytest.mark.parametrize("policies", POLICIES)
+def test_same_outcome(random_games, policies):
+    for game_dict, base_cases in random_games:
+        expected, nodes = evaluate("_", game_dict, base_cases, 0, 0, {})
+        proof = ProofRecorder()
+        value, ordered_nodes = evaluate("_", game_dict, base_cases, 0, 0, {}, proof=proof, ordering=MoveOrdering(policies, game_dict, base_cases))
+        assert value == expected
+        assert proof.root.value == expected
+        if not policies:
+            assert ordered_nodes == nodes
+
+def test_base_ranks():
+    # x wins by moving to "a" + "b" (L + P), might win with "c" + "a" (N + L), and loses with "d" + "b" (R + P)
+    base_cases = {"a": "L", "b": "P", "c": "N", "d": "R"}
+    ordering = MoveOrdering(["base"], {}, base_cases)
+    assert ordering.order([("d", "b"), ("c", "a"), ("a", "b")], 'x', set()) == [("a", "b"), ("c", "a"), ("d", "b")]
+    assert ordering.order([("d", "b"), ("c", "a"), ("a", "b")], 'x', {("d", "b")})[0] == ("d", "b")
+    assert ordering.order([("a", "b"), ("d", "b")], 'o', set()) == [("d", "b"), ("a", "b")]
+
+def test_history():
+    ordering = MoveOrdering(["history"], {}, {})
+    ordering.cutoff(("b", "c"))
+    assert ordering.order([("a", "b"), ("b", "c")], 'o', set()) == [("b", "c"), ("a", "b")]
+
+def test_cheap_summand():
+    game_dict = {"_": {"x": (("x_", "_o"),), "o": ()}, "x_": {"x": ((), ()), "o": ()}, "_o": {"x": (), "o": ()}}
+    ordering = MoveOrdering(["cheap"], game_dict, {})
+    assert ordering.summands(("x_", "_o"), {}) == ("_o", "x_")
+    assert ordering.summands(("_o", "xo"), {}) == ("xo", "_o")
+    assert ordering.summands(("x_", "_o"), {"x_": 0}) == ("x_", "_o")
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        MoveOrdering(["random"], {}, {})
@@ -0,0 +1,33 @@
+import pytest
+from itertools import product, combinations_with_replacement
+from outcomes import CLASSES, SUM, X_FEATURES, O_FEATURES, VALUE, to_mask, to_name
+from prover import outcome_add, expand_outcomes, compute_value
+
+SINGLE = ["L", "R", "N", "P", "U"]
+SUMS = SINGLE + [("L", "N"), ("N", "R")]
+
+@pytest.mark.parametrize("a, b", list(product(SINGLE, repeat=2)))
+def test_sum(a, b):
+    assert SUM[CLASSES[a]][CLASSES[b]] == to_mask(outcome_add(a, b))
+
+def old_value(x_values, o_values):
+    values = set()
+    for left in expand_outcomes(list(x_values)):
+        for right in expand_outcomes(list(o_values)):
+            values.add(compute_value({"left": left, "right": right}))
+    return values.pop() if len(values) == 1 else "U"
+
+def test_value():
+    move_sets = [c for n in range(3) for c in combinations_with_replacement(SUMS, n)]
+    for x_values, o_values in product(move_sets, repeat=2):
+        x_features = 0
+        for outcome in x_values:
+            x_features |= X_FEATURES[to_mask(outcome)]
+        o_features = 0
+        for outcome in o_values:
+            o_features |= O_FEATURES[to_mask(outcome)]
+        assert to_name(VALUE[x_features][o_features]) == old_value(x_values, o_values)
+
+@pytest.mark.parametrize("outcome", SUMS)
+def test_round_trip(outcome):
+    assert to_name(to_mask(outcome)) == outcome
@@ -0,0 +1,46 @@
+import pytest
+from conftest import random_game
+from graph import compile_game_graph
+from search import search_graph
+from parallel import evaluate_parallel
+
+def test_matches_serial():
+    for seed in range(5):
+        game_dict, base_cases = random_game(seed, patterns=12, leaves=3, max_moves=4)
+        graph = compile_game_graph(game_dict, base_cases)
+        expected, _ = search_graph(graph, graph.ids["_"], {})
+        value, nodes = evaluate_parallel(graph, graph.ids["_"], 2, interval=100)
+        assert value == expected
+        assert nodes > 0
+
+def test_donates():
+    # decided root (L) after about 1100 nodes, so the worker searching it has work to give away
+    game_dict, base_cases = random_game(36, patterns=12, leaves=3, max_moves=4)
+    graph = compile_game_graph(game_dict, base_cases)
+    expected, _ = search_graph(graph, graph.ids["_"], {})
+    assert expected == "L"
+    stats = {}
+    value, nodes = evaluate_parallel(graph, graph.ids["_"], 2, interval=100, stats=stats)
+    assert value == expected
+    assert stats["donated"] > 0
+
+def test_single_job():
+    game_dict, base_cases = random_game(0)
+    graph = compile_game_graph(game_dict, base_cases)
+    assert evaluate_parallel(graph, graph.ids["_"], 1) == search_graph(graph, graph.ids["_"], {})
+
+def test_worker_error():
+    game_dict, base_cases = random_game(0)
+    graph = compile_game_graph(game_dict, base_cases)
+    with pytest.raises(IndexError):
+        evaluate_parallel(graph, len(graph.names), 2)
+
+def test_good_moves_merged():
+    game_dict, base_cases = random_game(1, patterns=12, leaves=3, max_moves=4)
+    graph = compile_game_graph(game_dict, base_cases)
+    serial = {}
+    search_graph(graph, graph.ids["_"], serial)
+    good_moves = {(-1, 'x'): {0}}
+    evaluate_parallel(graph, graph.ids["_"], 2, good_moves, interval=100)
+    assert good_moves[(-1, 'x')] == {0}
+    assert len(good_moves) > 1 or not any(serial.values())
@@ -0,0 +1,32 @@
+import sys
+from prover import evaluate
+from scc import evaluate_scc
+
+def test_matches_recursive(random_games):
+    for game_dict, base_cases in random_games:
+        assert evaluate_scc("_", game_dict, base_cases)[0] == evaluate("_", game_dict, base_cases, 0, 0, {})[0]
+
+def test_small_position():
+    assert evaluate_scc("xo", {}, {"xo": "N"}) == ("N", 1)
+
+def test_deep_chain():
+    # an acyclic chain is resolved bottom-up, one node per state and without recursion
+    depth = sys.getrecursionlimit() * 2
+    game_dict = {}
+    for i in range(depth):
+        game_dict[f"{'x' * i}_"] = {"x": ((f"{'x' * (i + 1)}_", ""),), "o": ()}
+    game_dict[f"{'x' * depth}_"] = {"x": (), "o": ()}
+    base_cases = {"": "P", f"{'x' * depth}_": "P"}
+    assert evaluate_scc("_", game_dict, base_cases) == ("L", depth + 1)
+
+def test_cycle():
+    # "_" and "x_" form a cycle, and "xx_" moves to itself
+    game_dict = {
+        "_": {"x": (("x_", ""),), "o": (("xx_", ""),)},
+        "x_": {"x": (("_", "o"),), "o": ()},
+        "xx_": {"x": (("xx_", ""),), "o": ()}
+    }
+    base_cases = {"": "P", "o": "R", "_": "N", "x_": "L", "xx_": "P"}
+    good_moves = {}
+    assert evaluate_scc("_", game_dict, base_cases, good_moves)[0] == evaluate("_", game_dict, base_cases, 0, 0, {})[0]
+    assert good_moves[("xx_", "x")] == {("xx_", "")}
@@ -0,0 +1,107 @@
+import random
+import stat
+import pytest
+import segclobber
+from scheduler import SolverScheduler
+from cache import OutcomeCache
+
+# stand-in for SEGClobber: the player to move wins if they have more pieces (which is not
+# Clobber, so the tests of scheduling use reduce=False to send positions to it unchanged),
+# fails on positions containing "WWWW", and fails the first call for "BWB" with B to move
+STUB = '''#!/usr/bin/env python3
+import os, sys
+position, player = sys.argv[1], sys.argv[2]
+log = os.path.join(os.path.dirname(__file__), "calls.log")
+with open(log, "a") as f:
+    f.write(f"{position} {player}\\n")
+if "WWWW" in position:
+    sys.exit(1)
+if position == "BWB" and player == "B" and open(log).read().count("BWB B") == 1:
+    sys.exit(1)
+other = "W" if player == "B" else "B"
+print(player if position.count(player) > position.count(other) else other)
+'''
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    binary = tmp_path / "segclobber"
+    binary.write_text(STUB)
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("SEGCLOBBER_BINARY", str(binary))
+    monkeypatch.setattr(segclobber, "backend", "binary")
+    return tmp_path / "calls.log"
+
+def calls(log):
+    return log.read_text().split("\n")[:-1] if log.exists() else []
+
+def test_deduplicates(stub):
+    scheduler = SolverScheduler(workers=4, reduce=False)
+    result = scheduler.solve(["xxo", "xo", "xxo", "", "ox"])
+    assert result == {"xxo": "L", "xo": "P", "": "P", "ox": "P"}
+    assert sorted(calls(stub)) == ["BBW B", "BBW W", "BW B", "BW W", "WB B", "WB W"]
+    scheduler.solve(["xo"])
+    assert len(calls(stub)) == 6
+    assert scheduler.stats() == {"requested": 6, "unique": 4, "forms": 4, "calls": 6, "failures": 0}
+
+def test_longest_first(stub):
+    SolverScheduler(workers=1, reduce=False).solve(["x", "xxo", "xo"])
+    assert [c.split()[0] for c in calls(stub)] == ["BBW", "BBW", "BW", "BW", "B", "B"]
+
+def test_retries_and_failures(stub):
+    scheduler = SolverScheduler(workers=2, retries=1, reduce=False)
+    result = scheduler.solve(["xox", "oooox"])
+    assert result == {"xox": "L", "oooox": "U"}
+    assert len(scheduler.failures) == 2
+    assert scheduler.stats()["calls"] == 2 + 1 + 4
+
+def test_compute_all_base_cases(stub):
+    scheduler = SolverScheduler(workers=4, reduce=False)
+    base_cases, small = segclobber.compute_all_base_cases(["x_", "_"], ["o", "xo"], "x", 4, scheduler)
+    assert base_cases == {"x_": "L", "": "P", "_": "L", "o": "R", "xo": "P"}
+    assert small == {"x_": [], "_": [""]}
+    assert len(calls(stub)) == 2 * 6
+    # 2 small games and 4 positions per pattern, each requested once
+    assert scheduler.stats()["requested"] == 10
+
+def test_outcome_cache(stub, tmp_path):
+    cache = OutcomeCache(str(tmp_path / "outcomes.sqlite"))
+    assert SolverScheduler(cache=cache, reduce=False).solve(["xxo"]) == {"xxo": "L"}
+    cache.close()
+    cache = OutcomeCache(str(tmp_path / "outcomes.sqlite"))
+    scheduler = SolverScheduler(cache=cache, reduce=False)
+    assert scheduler.solve(["oxx", "oox", "xxo", "oxo"]) == {"oxx": "L", "oox": "R", "xxo": "L", "oxo": "R"}
+    assert scheduler.stats()["cache"] == {"hits": 3, "misses": 1, "hit_rate": 0.75}
+    assert len(calls(stub)) == 4
+
+def test_reduce(stub):
+    scheduler = SolverScheduler(workers=4)
+    result = scheduler.solve(["xxo", "oox", "xxx", "xxo.ooo", "oxx.xo.ox"])
+    # dead stones are dropped, oox is the negative of xxo, and ox is the reversal of xo
+    assert result == {"xxo": "L", "oox": "R", "xxx": "P", "xxo.ooo": "L", "oxx.xo.ox": "L"}
+    assert sorted(calls(stub)) == ["WB B", "WB W", "WWB B", "WWB W"]
+    assert scheduler.stats()["forms"] == 2
+
+def test_reduce_remainder(stub):
+    # L + R is not determined by the outcome classes, so the sum is solved
+    scheduler = SolverScheduler(workers=4)
+    assert scheduler.solve(["xxo.ooox", "xxo.oox.ooox"]) == {"xxo.ooox": "R", "xxo.oox.ooox": "R"}
+    # in the second sum xxo and oox cancel, leaving ooox
+    assert sorted(set(c.split()[0] for c in calls(stub))) == ["WWB", "WWWB", "WWWB.WBB"]
+
+def test_reduce_matches_solver(monkeypatch):
+    monkeypatch.setattr(segclobber, "backend", "python")
+    rng = random.Random(0)
+    positions = ["".join(rng.choice("xo.") for _ in range(rng.randint(0, 12))) for _ in range(300)]
+    assert SolverScheduler().solve(positions) == SolverScheduler(reduce=False).solve(positions)
+
+def test_adaptive_horizon(stub):
+    # with the stub and q = "x", "x_" is always L, "_" is P then L, and "o_" is R, P, then L
+    scheduler = SolverScheduler(workers=4, reduce=False)
+    horizons = {}
+    base_cases, small = segclobber.compute_all_base_cases(["x_", "_", "o_"], [], "x", 20, scheduler, window=3, horizons=horizons)
+    assert horizons == {"x_": (3, 1), "_": (4, 1), "o_": (5, 1)}
+    assert base_cases == {"x_": "L", "": "P", "_": "L", "o": "R", "ox": "P", "o_": "L"}
+    assert small == {"x_": [], "_": [""], "o_": ["o", "ox"]}
+    # 3 positions per pattern in the first round, then only oxxx and oxxxx as "_" and "o_" grow
+    assert scheduler.stats()["requested"] == 3 * 3 + 2
+    assert max(len(c.split()[0]) for c in calls(stub)) == len("oxxxx")
@@ -0,0 +1,49 @@
+import sys
+from prover import evaluate, ProofRecorder
+from search import evaluate_iterative, search_graph
+from graph import compile_game_graph
+from transposition import TranspositionTable
+
+def test_matches_recursive(random_games):
+    for game_dict, base_cases in random_games:
+        good_moves = {}
+        expected = evaluate("_", game_dict, base_cases, 0, 0, good_moves)
+        iterative_good_moves = {}
+        assert evaluate_iterative("_", game_dict, base_cases, iterative_good_moves) == expected
+        assert iterative_good_moves == {key: moves for key, moves in good_moves.items() if moves}
+
+def test_matches_recursive_with_table(random_games):
+    for game_dict, base_cases in random_games:
+        expected = evaluate("_", game_dict, base_cases, 0, 0, {}, table=TranspositionTable(100))
+        assert evaluate_iterative("_", game_dict, base_cases, {}, table=TranspositionTable(100)) == expected
+
+def test_small_position():
+    assert evaluate_iterative("xo", {}, {"xo": "N"}, {}) == ("N", 1)
+
+def test_deep_chain():
+    depth = sys.getrecursionlimit() * 2
+    game_dict = {}
+    for i in range(depth):
+        game_dict[f"{'x' * i}_"] = {"x": ((f"{'x' * (i + 1)}_", ""),), "o": ()}
+    game_dict[f"{'x' * depth}_"] = {"x": (), "o": ()}
+    base_cases = {"": "P", f"{'x' * depth}_": "P"}
+    value, nodes = evaluate_iterative("_", game_dict, base_cases, {})
+    assert value == "L"
+    assert nodes == 2 * depth + 1
+
+def count_searched(node):
+    if node.value is None: # skipped because the other subgame is U
+        return 0
+    children = node.left_children_x + node.right_children_x + node.left_children_o + node.right_children_o
+    return 1 + sum(count_searched(child) for child in children)
+
+def test_proof_recording(random_games):
+    for game_dict, base_cases in random_games:
+        recursive = ProofRecorder()
+        value, nodes = evaluate("_", game_dict, base_cases, 0, 0, {}, proof=recursive)
+        graph = compile_game_graph(game_dict, base_cases)
+        iterative = ProofRecorder()
+        assert search_graph(graph, graph.ids["_"], {}, proof=iterative) == (value, nodes)
+        assert recursive.root.value == value
+        assert count_searched(recursive.root) == nodes
+        assert recursive.root.to_json(0) == iterative.root.to_json(0)
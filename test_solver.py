@@ -0,0 +1,83 @@
+import pytest
+import random
+from solver import ClobberSolver, normalize, moves
+import segclobber
+
+def brute_force_wins(position, player):
+    '''
+    Plain minimax over the whole position, with "." for empty squares.
+    '''
+    other = "o" if player == "x" else "x"
+    for i, piece in enumerate(position):
+        if piece != player:
+            continue
+        for j in (i - 1, i + 1):
+            if 0 <= j < len(position) and position[j] == other:
+                child = list(position)
+                child[i], child[j] = ".", player
+                if not brute_force_wins("".join(child), other):
+                    return True
+    return False
+
+@pytest.mark.parametrize("components, expected", [
+    (["xxx", "", "o"], ()),
+    (["oxx"], ("oxx",)),
+    (["xxo"], ("oxx",)),
+    (["xo", "ox"], ()),
+    (["xo", "xo", "xo"], ("ox",)),
+    (["xxo", "oox", "xxo"], ("oxx",)),
+    (["xxo", "xxo"], ("oxx", "oxx"))
+])
+def test_normalize(components, expected):
+    assert normalize(components) == expected
+
+def test_moves():
+    assert sorted(moves("xoxo", "x")) == [("", "xxo"), ("xo", "x"), ("xx", "o")]
+    assert sorted(moves("xo", "o")) == [("o", "")]
+
+def test_matches_brute_force():
+    rng = random.Random(0)
+    solver = ClobberSolver()
+    for _ in range(300):
+        position = "".join(rng.choice("xo.") for _ in range(rng.randint(0, 9)))
+        expected = (brute_force_wins(position, "x"), brute_force_wins(position, "o"))
+        assert solver.first_player_wins(position) == expected
+
+@pytest.mark.parametrize("position, expected", [
+    ("", "P"),
+    ("xo", "N"),
+    ("xxo", "L"),
+    ("oox", "R"),
+    ("xoxo", "N"),
+    ("o" + "x" * 10, "L")
+])
+def test_get_outcome_class_python(position, expected, monkeypatch):
+    monkeypatch.setattr(segclobber, "backend", "python")
+    assert segclobber.get_outcome_class(position) == expected
+
+def test_auto_falls_back_without_binary(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEGCLOBBER_BINARY", str(tmp_path / "missing"))
+    monkeypatch.setattr(segclobber, "backend", "auto")
+    assert segclobber.resolve_backend() == "python"
+    assert segclobber.get_outcome_class("xxo") == "L"
+
+@pytest.mark.parametrize("outcomes, period, expected", [
+    ([], 1, 0),
+    (["L"], 1, 0),
+    (["P", "N", "L", "L", "L"], 1, 2),
+    (["P", "N", "L", "N"], 1, 3),
+    (["P", "L", "N", "L", "N"], 2, 1),
+    (["P", "L", "N", "L", "N"], 1, 4)
+])
+def test_stable_tail(outcomes, period, expected):
+    assert segclobber.stable_tail(outcomes, period) == expected
+
+@pytest.mark.parametrize("outcomes, window, expected", [
+    (["P", "N", "L", "L"], 2, 1),
+    (["P", "N", "L", "L"], 3, None),
+    (["P", "N", "L", "L", "L"], 3, 1),
+    (["P", "L", "N", "L", "N", "L", "N"], 3, 2),
+    (["P", "L", "N", "L", "N"], 3, None)
+])
+def test_find_period(outcomes, window, expected):
+    assert segclobber.find_period(outcomes, window) == expected
@@ -0,0 +1,38 @@
+from prover import evaluate
+from search import search_graph
+from graph import compile_game_graph
+from telemetry import Telemetry, read_telemetry
+from transposition import TranspositionTable
+
+def test_engines_agree(random_games, tmp_path):
+    for i, (game_dict, base_cases) in enumerate(random_games):
+        recursive = Telemetry(tmp_path / f"recursive{i}.jsonl", interval=7)
+        value, nodes = evaluate("_", game_dict, base_cases, 0, 0, {}, telemetry=recursive)
+        recursive.close()
+        graph = compile_game_graph(game_dict, base_cases)
+        iterative = Telemetry(tmp_path / f"iterative{i}.jsonl", interval=7)
+        assert search_graph(graph, graph.ids["_"], {}, telemetry=iterative) == (value, nodes)
+        iterative.close()
+        records = read_telemetry(recursive.path)
+        assert [r["nodes"] for r in records] == list(range(7, nodes + 1, 7)) + [nodes]
+        assert records[-1]["done"] and not any(r["done"] for r in records[:-1])
+        for r1, r2 in zip(records, read_telemetry(iterative.path)):
+            for key in ["nodes", "depth", "max_depth", "hypotheses", "expansions", "branching"]:
+                assert r1[key] == r2[key]
+            assert sorted(s["visits"] for s in r1["states"]) == sorted(s["visits"] for s in r2["states"])
+
+def test_counts(tmp_path):
+    # "_" has one x-move to "x_" and "", and "x_" has one o-move back to "_"
+    game_dict = {"_": {"x": (("x_", ""),), "o": ()}, "x_": {"x": (), "o": (("_", ""),)}}
+    base_cases = {"": "P", "_": "L", "x_": "R"}
+    table = TranspositionTable(10)
+    telemetry = Telemetry(tmp_path / "telemetry.jsonl", caches={"table": table})
+    assert evaluate("_", game_dict, base_cases, 0, 0, {}, table=table, telemetry=telemetry) == ("L", 5)
+    telemetry.close()
+    [record] = read_telemetry(tmp_path / "telemetry.jsonl")
+    assert record["nodes"] == 5
+    assert record["max_depth"] == 1
+    assert record["hypotheses"] == 1
+    assert record["branching"] == 1.0
+    assert record["caches"]["table"]["misses"] == 2
+    assert record["states"] == [{"state": "_", "visits": 1, "x": 1, "o": 0}, {"state": "x_", "visits": 1, "x": 0, "o": 1}]
@@ -0,0 +1,51 @@
+import pytest
+from transposition import TranspositionTable
+from prover import evaluate
+
+GAME_DICT = {
+    "_": {"x": (("_x", "x"), ("", "_")), "o": (("_", "o"),)},
+    "_x": {"x": (("_", "x"),), "o": (("_", "x_"), ("_x", ""))},
+    "x_": {"x": (("x", "_x"),), "o": (("x", "_"),)}
+}
+BASE_CASES = {"_": "L", "_x": "L", "x_": "N", "x": "L", "o": "R", "": "P"}
+
+@pytest.mark.parametrize("used, path, expected", [
+    (set(), {}, "L"),
+    ({"_"}, {}, "L"),
+    ({"_"}, {"_": 0}, "L"),
+    ({"_", "_x"}, {"_": 0, "_x": 1}, "L"),
+    ({"_", "_x"}, {"_": 0}, None)
+])
+def test_lookup(used, path, expected):
+    table = TranspositionTable(10)
+    table.store("x_", "L", used)
+    assert table.lookup("x_", path) == expected
+
+def test_eviction():
+    table = TranspositionTable(2)
+    table.store("_", "L", set())
+    table.store("_x", "R", set())
+    table.lookup("_", {})
+    table.store("x_", "N", set())
+    assert table.lookup("_x", {}) is None
+    assert table.lookup("_", {}) == "L"
+    assert table.stats()["evictions"] == 1
+
+def test_leave_propagates_ancestors():
+    table = TranspositionTable(10)
+    table.enter()
+    table.enter()
+    table.depend("_")
+    table.depend("_x")
+    table.leave("_x", "L")
+    assert table.entries["_x"] == ("L", frozenset({"_"}))
+    table.leave("_", "N")
+    assert table.entries["_"] == ("N", frozenset())
+
+def test_evaluate_with_table():
+    expected, nodes = evaluate("_", GAME_DICT, BASE_CASES, 0, 0, {})
+    table = TranspositionTable(10)
+    value, table_nodes = evaluate("_", GAME_DICT, BASE_CASES, 0, 0, {}, table=table)
+    assert value == expected
+    assert table_nodes <= nodes
+    assert table.hits + table.misses > 0
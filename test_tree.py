@@ -1,4 +1,5 @@
 import pytest
+import random
 import tree
 
 def normalize(l):
@@ -33,4 +34,48 @@ def test_clean(children, expected):
     ("xoxxxoxxoxxoooxxo", "xxo", 3, 12, "xox_ooxxo")
 ])
 def test_reduce(s, term, lb, ub, expected):
-    assert tree.reduce(s, term, lb, ub) == expected
\ No newline at end of file
+    assert tree.reduce(s, term, lb, ub) == expected
+@pytest.mark.parametrize("position, q", [
+    ("_", "x"),
+    ("_", "xxo"),
+    ("xx_", "xxo"),
+    ("o_o", "xxo"),
+    ("xoo_ox", "x"),
+    ("oox_", "o"),
+    ("x_o", "xoxo"),
+    ("ox_xo", "xoxxox"),
+    ("xxo_oxo", "oxxoxo")
+])
+def test_symbolic_moves(position, q):
+    assert tree.symbolic_moves(position, q) == tree.find_moves(position, q)
+
+def test_symbolic_moves_random():
+    rng = random.Random(0)
+    for _ in range(2000):
+        q = "".join(rng.choice("xo") for _ in range(rng.randint(1, 6)))
+        position = "".join(rng.choice("xo") for _ in range(rng.randint(0, 5))) + "_" + "".join(rng.choice("xo") for _ in range(rng.randint(0, 5)))
+        assert tree.symbolic_moves(position, q) == tree.find_moves(position, q)
+
+@pytest.mark.parametrize("head, q, copies, suffix", [
+    ("", "xxo", 0, "x"),
+    ("", "xxo", 1, ""),
+    ("xo", "xxo", 3, "o"),
+    ("oo", "xo", 2, ""),
+    ("ooxo", "xoxo", 3, "x"),
+    ("oxo", "xoxoo", 2, "")
+])
+def test_reduce_right(head, q, copies, suffix):
+    s = head + q * copies + suffix
+    assert tree.reduce_right(head, q, copies, suffix) == tree.reduce(s, q, -len(suffix) - 4 * len(q), -len(suffix))
+
+def test_clean_matches_pairwise():
+    rng = random.Random(0)
+    def subgame():
+        s = "".join(rng.choice("xo") for _ in range(rng.randint(0, 4)))
+        if rng.random() < 0.6:
+            i = rng.randint(0, len(s))
+            s = s[:i] + "_" + s[i:]
+        return s
+    for _ in range(500):
+        children = {tuple(sorted([subgame(), subgame()])) for _ in range(rng.randint(0, 15))}
+        assert tree.clean(children) == tree.clean_pairwise(children)
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+
+class TranspositionTable:
+    '''
+    Bounded cache of evaluated positions for the inductive search.
+
+    The value of a pattern depends on which positions are on the current search
+    path, since those are replaced by their inductive hypotheses. Each entry therefore
+    stores the value of a state together with the set of ancestors (states on
+    path_visited) whose inductive hypotheses were used to compute it. A stored value
+    is reused if none of those ancestors are on the current path, or if all of them are.
+    When the table is full, the least recently used entry is evicted.
+    '''
+    def __init__(self, size=1000000):
+        self.size = size
+        self.entries = OrderedDict() # state -> (value, frozenset of ancestors used)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dependencies = [] # one set of used hypotheses per state on the current path
+
+    def lookup(self, state, path_visited):
+        '''
+        Return the stored value of state if it can be reused on the current path,
+        otherwise return None.
+        '''
+        entry = self.entries.get(state)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, used = entry
+        on_path = [ancestor for ancestor in used if ancestor in path_visited]
+        if on_path and len(on_path) != len(used):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(state)
+        for ancestor in on_path:
+            self.depend(ancestor)
+        return value
+
+    def store(self, state, value, used):
+        '''
+        Save the value of state and the ancestors it depends on, evicting the
+        least recently used entry if the table is full.
+        '''
+        if self.size <= 0:
+            return
+        self.entries[state] = (value, frozenset(used))
+        self.entries.move_to_end(state)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def enter(self):
+        '''
+        Start collecting the hypotheses used by the state being expanded.
+        '''
+        self.dependencies.append(set())
+
+    def depend(self, ancestor):
+        '''
+        Record that the state being expanded used the inductive hypothesis of ancestor.
+        '''
+        if self.dependencies:
+            self.dependencies[-1].add(ancestor)
+
+    def leave(self, state, value):
+        '''
+        Finish expanding state: store its value, and pass any hypotheses on states
+        other than itself up to its parent.
+        '''
+        used = self.dependencies.pop()
+        used.discard(state)
+        if self.dependencies:
+            self.dependencies[-1].update(used)
+        self.store(state, value, used)
+
+    def stats(self):
+        '''
+        Summary of table usage.
+        '''
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.entries),
+            "evictions": self.evictions
+        }
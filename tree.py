@@ -1,6 +1,10 @@
 import re
+from functools import lru_cache
+from itertools import product
 from pprint import pp
 
+COPIES = 4 # copies of q that "_" is expanded to when finding moves
+
 def xxo_conjecture(position, q):
     '''
     Returns the sumgame tuple resulting from making the leftmost move by x, capturing to the right.
@@ -49,10 +53,122 @@ def find_moves(position, q):
                 children[piece].add(tuple(simplified_position))
     return children
 
+def reduce_left(prefix, q, copies, tail):
+    '''
+    Reduce the left subgame prefix + q^copies + tail of a move, where tail holds no
+    copy of q, the same way as reduce(s, q, len(prefix), len(prefix) + COPIES*len(q)).
+    '''
+    if copies == 0:
+        return prefix + tail
+    if not prefix and copies == 1 and not tail: # reduce leaves q itself alone
+        return q
+    return f"{prefix}_{tail}"
+
+def reduce_right(head, q, copies, suffix):
+    '''
+    Reduce the right subgame head + q^copies + suffix of a move, where head is what is
+    left of a broken copy of q, the same way as reduce(s, q, -len(suffix) - COPIES*len(q), -len(suffix)).
+    '''
+    if copies == 0:
+        return head + suffix
+    if not head and copies == 1 and not suffix: # reduce leaves q itself alone
+        return q
+    start = (head + q).find(q) # first match, either in head or at the first full copy
+    if start == len(head):
+        return f"{head}_{suffix}"
+    # the match overlaps the copies by {overlap}, and only runs on if q equals its rotation by that much
+    overlap = len(q) - (len(head) - start)
+    rest = q[overlap:]
+    if rest + q[:overlap] != q:
+        rest += q * (copies - 1)
+    return f"{head[:start]}_{rest}{suffix}"
+
+@lru_cache(None)
+def symbolic_moves(position, q):
+    '''
+    Returns the same sumgame tuples as find_moves, but works on the prefix, copies of q
+    and suffix of the position directly instead of expanding "_" into a string and
+    searching it with a regex for copies of q. Results are cached per (position, q).
+
+    :param position: a position of the form "p_s"
+    :param q: the repeating pattern
+    :returns children: a dictionary of frozensets containing tuples of all resulting sumgames for x and o
+    '''
+    prefix, suffix = position.split("_")
+    start = len(prefix) # first position in the copies of q
+    end = start + COPIES * len(q) # first position in the suffix
+
+    def piece(i):
+        if i < start:
+            return prefix[i]
+        if i < end:
+            return q[(i - start) % len(q)]
+        return suffix[i - end]
+
+    def left(stop, last=""):
+        # subgame of all pieces before {stop}, followed by last
+        if stop + len(last) <= start:
+            return prefix[:stop] + last
+        if stop < end:
+            copies, r = divmod(stop - start, len(q))
+            return reduce_left(prefix, q, copies, q[:r] + last)
+        return reduce_left(prefix, q, COPIES, suffix[:stop - end] + last)
+
+    def right(begin, first=""):
+        # subgame of all pieces from {begin} on, with the first replaced by first
+        rest = begin + 1 if first else begin
+        if begin < start:
+            return first + prefix[rest:] + reduce_right("", q, COPIES, suffix)
+        if begin < end:
+            copies, r = divmod(begin - start, len(q))
+            if first or r:
+                return reduce_right(first + q[rest - start - copies * len(q):], q, COPIES - copies - 1, suffix)
+            return reduce_right("", q, COPIES - copies, suffix)
+        return first + suffix[rest - end:]
+
+    children = {"x": set(), "o": set()}
+    for i in range(end + len(suffix) - 1):
+        a, b = piece(i), piece(i + 1)
+        if a != b:
+            children[a].add(tuple(sorted([left(i), right(i + 1, a)]))) # a captures to the right
+            children[b].add(tuple(sorted([left(i, b), right(i + 2)]))) # b captures to the left
+    return {player: frozenset(sumgames) for player, sumgames in children.items()}
+
+def signature(sumgame):
+    '''
+    Positions of the underscores in each subgame of a sumgame, None for a subgame without one.
+    '''
+    return tuple(g.index("_") if "_" in g else None for g in sumgame)
+
 def clean(children):
     '''
     Takes a list of sumgame tuples. If both subgames contain underscores, replace 
     all other sumgames that are equivalent if underscores are removed.
+    Gives the same result as clean_pairwise, but looks each sumgame up by the
+    signature of its underscores instead of comparing every pair of sumgames.
+
+    :param children: list of sumgame tuples
+    :returns result: children with all duplicated sumgames removed
+    '''
+    result = set()
+    covered = set() # signatures of sumgames that a two-underscore sumgame replaces
+    for sumgame in children:
+        total_underscores = sum(s.count("_") for s in sumgame)
+        if total_underscores == 2:
+            result.add(sumgame)
+            # a subgame without an underscore is equivalent to any subgame in its place
+            for mask in product((False, True), repeat=len(sumgame)):
+                covered.add(tuple(None if wild else i for wild, i in zip(mask, signature(sumgame))))
+    for sumgame in children:
+        if signature(sumgame) not in covered:
+            result.add(sumgame)
+    return result
+
+def clean_pairwise(children):
+    '''
+    Takes a list of sumgame tuples. If both subgames contain underscores, replace 
+    all other sumgames that are equivalent if underscores are removed.
+    Compares every pair of sumgames; see clean for the indexed version.
 
     :param children: list of sumgame tuples
     :returns result: children with all duplicated sumgames removed